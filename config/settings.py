@@ -3,29 +3,35 @@ All settings, configurations, and constants for the NBA AI Analyst.
 '''
 
 import os
+from typing import Dict, Final
 
 # models
-EMBEDDING_MODEL = "text-embedding-3-small"
-PLANNER_AGENT = "gpt-4o-mini"
-RETRIEVAL_AGENT = "gpt-4o-mini"
-ROUTER_AGENT = "gpt-4o-mini"
-SYNTHESIS_AGENT = "gpt-4o-mini"
-ORCHESTRATOR_AGENT = "gpt-4o-mini"
+EMBEDDING_MODEL: Final[str] = "text-embedding-3-small"
+PLANNER_AGENT: Final[str] = "gpt-4o-mini"
+RETRIEVAL_AGENT: Final[str] = "gpt-4o-mini"
+ROUTER_AGENT: Final[str] = "gpt-4o-mini"
+SYNTHESIS_AGENT: Final[str] = "gpt-4o-mini"
+ORCHESTRATOR_AGENT: Final[str] = "gpt-4o-mini"
 
 # Data paths
-DATA_DIR = "data"
-
-RAW_DATA_DIR = os.path.join(DATA_DIR, "raw_csv")
-DATASETS = {
-    "player_contracts": os.path.join(RAW_DATA_DIR, "player_contracts_with_notes.csv"),
-    "player_stats": os.path.join(RAW_DATA_DIR, "all_player_stats_by_team.csv"),
-    "team_capsheets": os.path.join(RAW_DATA_DIR, "team_capsheets.csv"),
-    "team_picks": os.path.join(RAW_DATA_DIR, "nba_draft_picks_rag.csv"),
-    "team_stats": os.path.join(RAW_DATA_DIR, "total_team_stats.csv")
+DATA_DIR: Final[str] = "data"
+
+RAW_DATA_DIR: Final[str] = os.path.join(DATA_DIR, "raw_csv")
+PLAYER_CONTRACTS_CSV: Final[str] = os.path.join(RAW_DATA_DIR, "player_contracts_with_notes.csv")
+PLAYER_STATS_CSV: Final[str] = os.path.join(RAW_DATA_DIR, "all_player_stats_by_team.csv")
+TEAM_CAPSHEETS_CSV: Final[str] = os.path.join(RAW_DATA_DIR, "team_capsheets.csv")
+TEAM_PICKS_CSV: Final[str] = os.path.join(RAW_DATA_DIR, "nba_draft_picks_rag.csv")
+TEAM_STATS_CSV: Final[str] = os.path.join(RAW_DATA_DIR, "total_team_stats.csv")
+DATASETS: Final[Dict[str, str]] = {
+    "player_contracts": PLAYER_CONTRACTS_CSV,
+    "player_stats": PLAYER_STATS_CSV,
+    "team_capsheets": TEAM_CAPSHEETS_CSV,
+    "team_picks": TEAM_PICKS_CSV,
+    "team_stats": TEAM_STATS_CSV
 }
 
-PARQUET_DATA_DIR = os.path.join(DATA_DIR, "parquet")
-PARQUET_FOLDERS = {
+PARQUET_DATA_DIR: Final[str] = os.path.join(DATA_DIR, "parquet")
+PARQUET_FOLDERS: Final[Dict[str, str]] = {
     "player_contracts": PARQUET_DATA_DIR,
     "player_stats": PARQUET_DATA_DIR,
     "team_capsheets": PARQUET_DATA_DIR,
@@ -33,12 +39,37 @@ PARQUET_FOLDERS = {
     "team_stats": PARQUET_DATA_DIR
 }
 
+# DuckDB database holding the cleaned tables (written by src/parquet_builders, queried by the compute tools)
+WAREHOUSE_DB: Final[str] = os.path.join(DATA_DIR, "warehouse.duckdb")
+
+# Untransformed Parquet snapshots of the raw CSVs (read by the embedding scripts)
+RAW_PARQUET_DIR: Final[str] = os.path.join(PARQUET_DATA_DIR, "raw")
+RAW_PARQUET_PATHS: Final[Dict[str, str]] = {
+    key: os.path.join(RAW_PARQUET_DIR, f"{key}.parquet") for key in DATASETS
+}
+PLAYER_CONTRACTS_RAW_PARQUET: Final[str] = RAW_PARQUET_PATHS["player_contracts"]
+TEAM_PICKS_RAW_PARQUET: Final[str] = RAW_PARQUET_PATHS["team_picks"]
+PLAYER_STATS_RAW_PARQUET: Final[str] = RAW_PARQUET_PATHS["player_stats"]
+TEAM_CAPSHEETS_RAW_PARQUET: Final[str] = RAW_PARQUET_PATHS["team_capsheets"]
+TEAM_STATS_RAW_PARQUET: Final[str] = RAW_PARQUET_PATHS["team_stats"]
+
+# On-disk cache of document embeddings (keyed by SHA-256 of page_content)
+EMBEDDING_CACHE_DIR: Final[str] = ".embedding_cache"
+
+# HNSW search breadth for the vectorstore indexes (higher = better recall, slower queries)
+HNSW_EF_SEARCH: Final[int] = 64
+
 # Vectorstore output directories
-VECTORSTORE_DIR = "vector_stores"
-INDEX_PATHS = {
-    "player_contracts": os.path.join(VECTORSTORE_DIR, "player_contracts_index"),
-    "player_stats": os.path.join(VECTORSTORE_DIR, "player_stats_index"),
-    "team_capsheets": os.path.join(VECTORSTORE_DIR, "team_capsheets_index"),
-    "team_picks": os.path.join(VECTORSTORE_DIR, "team_picks_index"),
-    "team_stats": os.path.join(VECTORSTORE_DIR, "team_stats_index")
+VECTORSTORE_DIR: Final[str] = "vector_stores"
+PLAYER_CONTRACTS_INDEX: Final[str] = os.path.join(VECTORSTORE_DIR, "player_contracts_index")
+PLAYER_STATS_INDEX: Final[str] = os.path.join(VECTORSTORE_DIR, "player_stats_index")
+TEAM_CAPSHEETS_INDEX: Final[str] = os.path.join(VECTORSTORE_DIR, "team_capsheets_index")
+TEAM_PICKS_INDEX: Final[str] = os.path.join(VECTORSTORE_DIR, "team_picks_index")
+TEAM_STATS_INDEX: Final[str] = os.path.join(VECTORSTORE_DIR, "team_stats_index")
+INDEX_PATHS: Final[Dict[str, str]] = {
+    "player_contracts": PLAYER_CONTRACTS_INDEX,
+    "player_stats": PLAYER_STATS_INDEX,
+    "team_capsheets": TEAM_CAPSHEETS_INDEX,
+    "team_picks": TEAM_PICKS_INDEX,
+    "team_stats": TEAM_STATS_INDEX
 }
@@ -1,5 +1,7 @@
 from __future__ import annotations
 import json
+import logging
+import os
 import traceback
 
 from src.agents.planner_agent import PlannerAgent
@@ -8,23 +10,27 @@ from src.agents.synthesis_agent import OutputSynthesisAgent
 from src.execution.executor import execute_ops
 from src.tools.tool_registry import ALL_TOOLS
 
+log = logging.getLogger(__name__)
+
+
+# Built once per process: their decision caches, system prompts and bound tools are reused across questions
+_planner = PlannerAgent()
+_router = RouterAgent()
+_synth = OutputSynthesisAgent()
 
-def run_pipeline(question: str) -> str:
-    planner = PlannerAgent()
-    router = RouterAgent()
-    synth = OutputSynthesisAgent()
 
+def run_pipeline(question: str) -> str:
     # 1. Plan
-    plan = planner.invoke(question)
+    plan = _planner.invoke(question)
 
     # 2. Route
-    ops = router.invoke(plan)
+    ops = _router.invoke(plan)
 
     # 3. Execute tools
     exec_results = execute_ops(ops, ALL_TOOLS)
 
     # 4. Synthesize final answer
-    answer = synth.invoke(question, exec_results, plan)
+    answer = _synth.invoke(question, exec_results, plan)
     return plan, ops, exec_results, answer
 
 
@@ -38,14 +44,11 @@ def interactive():
 
             plan, ops, exec_results, answer = run_pipeline(q)
 
-            print("\n=== Planner Output ===")
-            print(json.dumps(plan, indent=2, ensure_ascii=False))
-
-            print("\n=== Routed Ops ===")
-            print(json.dumps(ops, indent=2, ensure_ascii=False))
-
-            print("\n=== Executor Results ===")
-            print(json.dumps(exec_results, indent=2, ensure_ascii=False))
+            # Intermediate dumps only when debugging (LOG_LEVEL=DEBUG); skips the pretty-printing otherwise
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("=== Planner Output ===\n%s", json.dumps(plan, indent=2, ensure_ascii=False))
+                log.debug("=== Routed Ops ===\n%s", json.dumps(ops, indent=2, ensure_ascii=False))
+                log.debug("=== Executor Results ===\n%s", json.dumps(exec_results, indent=2, ensure_ascii=False))
 
             print("\n=== Synthesis ===")
             print(answer)
@@ -59,4 +62,5 @@ def interactive():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
     interactive()
\ No newline at end of file
@@ -26,6 +26,7 @@ _orch = OrchestratorAgent()
 _planner = PlannerAgent()
 _router = RouterAgent()
 _synth = OutputSynthesisAgent()
+_retriever = RetrievalAgent()
 
 
 def _n_orchestrator(state: PipelineState) -> PipelineState:
@@ -34,9 +35,7 @@ def _n_orchestrator(state: PipelineState) -> PipelineState:
 
 
 def _n_retrieve(state: PipelineState) -> PipelineState:
-    # RetrievalAgent is lightweight; instantiate per call (or could cache)
-    retriever = RetrievalAgent()
-    raw = retriever.invoke(state["question"])
+    raw = _retriever.invoke(state["question"])
     # Normalize through synthesis for consistent formatting
     answer = _synth.invoke(state["question"], [{"tool": "retriever", "output": raw}], None)
     return {**state, "answer_markdown": answer}
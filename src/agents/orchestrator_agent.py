@@ -1,10 +1,12 @@
 # src/agents/orchestrator_agent.py
 from __future__ import annotations
 import os
+import re
 from typing import Dict, Any, Literal
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
+from src.common.cache import DecisionCache
 
 load_dotenv()
 
@@ -19,6 +21,36 @@ LLM_SYSTEM = (
     "Always choose exactly one.\n"
 )
 
+# Local prefilter: obvious questions are routed without an LLM call; only ambiguous ones reach the model.
+_ANALYZE_RE = re.compile(
+    r"\b(top|rank|ranked|ranking|compare|comparison|highest|lowest|average|mean|median|most|least|leaders?|standings?"
+    r"|best|worst|leading|largest|biggest|every"
+    r"|vs\.?|versus|per\s+game|how\s+many)\b",
+    re.I,
+)
+# Single-entity fact lookups: "who is ...", "what is X's contract", "tell me about ..."
+# (checked after _ANALYZE_RE, so "who is the best rebounder" is not caught here, and only taken
+# when the question names exactly one player or team)
+_RETRIEVE_RE = re.compile(r"^\s*(who\s+is|who's|what\s+is|what's|tell\s+me\s+about)\b", re.I)
+# Contract / cap / pick facts about one player or team are row lookups in the retriever indexes
+_RETRIEVE_TOPIC_RE = re.compile(r"\b(contracts?|salary|salaries|cap\s+hit|draft\s+picks?)\b", re.I)
+# Capitalized name spans ("Jalen Brunson", "Thunder"); question words and other capitalized
+# non-names are dropped before counting entities
+_NAME_SPAN_RE = re.compile(r"\b[A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*)*")
+_NON_NAME_WORDS = frozenset({
+    "what", "what's", "who", "who's", "which", "how", "show", "tell", "give", "list", "is", "are",
+    "does", "do", "the", "me", "i", "nba", "first", "second", "mvp", "roy", "dpoy", "all-star",
+})
+# More than one entity usually means a comparison -> leave it to the LLM
+_MULTI_ENTITY_RE = re.compile(r"\b(and|vs\.?|versus|or)\b|,", re.I)
+
+def _named_entity_count(question: str) -> int:
+    count = 0
+    for span in _NAME_SPAN_RE.findall(question):
+        words = [w for w in span.split() if w.lower().removesuffix("'s") not in _NON_NAME_WORDS]
+        count += bool(words)
+    return count
+
 class OrchestratorDecision(BaseModel):
     route: Literal["retrieve", "analyze"] = Field(..., description="Selected high-level path.")
     reason: str
@@ -32,8 +64,32 @@ class OrchestratorAgent:
             temperature=0,
             api_key=OPENAI_KEY
             )
+        # Repeated questions (same normalized text) reuse earlier LLM routing decisions. Exact match
+        # only: a semantic lookup costs an embedding call per miss, and near-identical questions
+        # about different players ("Jalen Williams" / "Jaylin Williams") must not share a route
+        self.cache = DecisionCache()
+
+    def _prefilter(self, question: str) -> OrchestratorDecision | None:
+        if _ANALYZE_RE.search(question):
+            return OrchestratorDecision(route="analyze", reason="keyword match", confidence=0.9, used_llm=False)
+        if _MULTI_ENTITY_RE.search(question):
+            return None
+        if _RETRIEVE_RE.search(question) and _named_entity_count(question) == 1:
+            return OrchestratorDecision(route="retrieve", reason="single-entity lookup", confidence=0.8, used_llm=False)
+        # Contract/cap/pick questions are row lookups only when they name exactly one player or team
+        if _RETRIEVE_TOPIC_RE.search(question) and _named_entity_count(question) == 1:
+            return OrchestratorDecision(route="retrieve", reason="contract/cap/pick lookup", confidence=0.8, used_llm=False)
+        return None
 
     def invoke(self, question: str) -> Dict[str, Any]:
+        decision = self._prefilter(question)
+        if decision is not None:
+            return decision.dict()
+
+        cached = self.cache.get(question)
+        if cached is not None:
+            return cached
+
         if not self.llm:
             return OrchestratorDecision(
                 route="retrieve",
@@ -62,12 +118,14 @@ class OrchestratorAgent:
             # Fallback: default to analyze (safer for multi-row questions)
             route = "analyze"
             text = f"Unrecognized response '{text}' -> default analyze"
-        return OrchestratorDecision(
+        decision = OrchestratorDecision(
             route=route,
             reason=f"LLM response: {text}",
             confidence=0.65,
             used_llm=True
         ).dict()
+        self.cache.put(question, decision)
+        return decision
 
     def stream(self, question: str):
         yield self.invoke(question)
@@ -1,21 +1,32 @@
 # src/agents/planner_agent.py
 from __future__ import annotations
 import os, re, json
-from typing import Any, Dict, List, Optional
+import logging
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.pydantic_v1 import BaseModel, Field
-from src.capabilities.manifest import MANIFEST
+from src.common.cache import DecisionCache
+from src.capabilities.manifest import MANIFEST, PLAYER_ALIAS_REV, TEAM_ALIAS_REV
+from src.capabilities.team_abbrev import TEAM_NAME_TO_ABBR
 from config.settings import PLANNER_AGENT
 
 load_dotenv()
+log = logging.getLogger(__name__)
 
 
 # ---------- Pydantic schema for structured output ----------
 class Entities(BaseModel):
-    players: List[str] = Field(default_factory=list)
-    teams: List[str] = Field(default_factory=list)
+    players: List[str] = Field(
+        default_factory=list,
+        description="Full player names as listed in the database, correctly capitalized (e.g. 'Stephen Curry', 'LeBron James').",
+    )
+    teams: List[str] = Field(
+        default_factory=list,
+        description="Full NBA team names (e.g. 'Golden State Warriors', 'Cleveland Cavaliers'); nicknames and abbreviations are resolved afterwards.",
+    )
 
 class Timeframe(BaseModel):
     season: Optional[str] = None
@@ -30,18 +41,54 @@ class Plan(BaseModel):
 
 
 # ---------- tiny helpers ----------
-def _canon(s: str) -> str:
-    return re.sub(r"\s+", " ", s.strip().lower())
+_WS_RE = re.compile(r"\s+")
+_YEAR_RE = re.compile(r"\b(20\d{2})\b")
 
-def _resolve_players(names: List[str], manifest: Dict[str, Any]) -> List[str]:
+def _canon(s: str) -> str:
+    return _WS_RE.sub(" ", s.strip().lower())
+
+def _team_display(name: str) -> str:
+    # "golden state warriors" -> "Golden State Warriors" (the casing used in the datasets)
+    return " ".join(w.capitalize() for w in name.split())
+
+# Nicknames that are not the last word of the full name
+_EXTRA_TEAM_NICKNAMES = {"sixers": "philadelphia 76ers", "trail blazers": "portland trail blazers"}
+
+# Team nicknames, aliases, full names and abbreviations -> full team name as stored in the datasets
+_TEAM_ALIAS_REV: Mapping[str, str] = MappingProxyType({
+    **{name.split()[-1]: _team_display(name) for name in TEAM_NAME_TO_ABBR},
+    **{k: _team_display(v) for k, v in _EXTRA_TEAM_NICKNAMES.items()},
+    **{_canon(abbr): _team_display(name) for name, abbr in TEAM_NAME_TO_ABBR.items()},
+    **{k: _team_display(v) for k, v in TEAM_ALIAS_REV.items()},
+    **{_canon(name): _team_display(name) for name in TEAM_NAME_TO_ABBR},
+})
+
+# Player aliases (read-only): alias or canonical name -> canonical name
+_PLAYER_ALIAS_REV: Mapping[str, str] = PLAYER_ALIAS_REV
+# One alternation over all aliases (longest first) to spot the ones a question mentions
+_PLAYER_ALIAS_RE = re.compile(
+    r"\b(" + "|".join(sorted(map(re.escape, _PLAYER_ALIAS_REV), key=len, reverse=True)) + r")\b"
+) if _PLAYER_ALIAS_REV else None
+# Cap on aliases sent with a question
+MAX_PROMPT_ALIASES = 10
+
+def _relevant_aliases(text: str, limit: int = MAX_PROMPT_ALIASES) -> Dict[str, str]:
+    """alias -> canonical name for the player nicknames that appear in `text`"""
+    found: Dict[str, str] = {}
+    if _PLAYER_ALIAS_RE is None:
+        return found
+    for m in _PLAYER_ALIAS_RE.finditer(_canon(text)):
+        alias = m.group(1)
+        canon = _PLAYER_ALIAS_REV[alias]
+        if alias != _canon(canon):
+            found.setdefault(alias, canon)
+            if len(found) >= limit:
+                break
+    return found
+
+def _resolve_players(names: List[str], rev: Mapping[str, str]) -> List[str]:
     if not names:
         return []
-    aliases: Dict[str, List[str]] = manifest.get("player_aliases", {})
-    rev: Dict[str, str] = {}
-    for canon, alts in aliases.items():
-        rev[_canon(canon)] = canon
-        for a in alts:
-            rev[_canon(a)] = canon
     out, seen = [], set()
     for n in names:
         k = _canon(n)
@@ -52,12 +99,21 @@ def _resolve_players(names: List[str], manifest: Dict[str, Any]) -> List[str]:
             seen.add(ck)
     return out
 
+def _resolve_teams(names: List[str]) -> List[str]:
+    out, seen = [], set()
+    for n in names or []:
+        team = _TEAM_ALIAS_REV.get(_canon(n), n)
+        if team not in seen:
+            out.append(team)
+            seen.add(team)
+    return out
+
 def _resolve_season_from_text(text: str, manifest: Dict[str, Any]) -> Optional[str]:
     t = text.lower()
     for k, v in manifest["seasons"]["phrase_map"].items():
         if k in t:
             return v
-    m = re.search(r"\b(20\d{2})\b", t)
+    m = _YEAR_RE.search(t)
     if m:
         y = int(m.group(1))
         return f"{y}-{str((y+1)%100).zfill(2)}"
@@ -81,20 +137,20 @@ class PlannerAgent:
         # keep the prompt tiny: datasets, metrics, aliases
         self.datasets = list(MANIFEST.get("tables", {}).keys())
         self.metric_keys = list(MANIFEST.get("glossary", {}).get("metrics", {}).keys())
-        self.team_aliases = MANIFEST.get("team_aliases", {})
         self.defaults = MANIFEST["seasons"]["defaults"]
         self.season_map = MANIFEST["seasons"]["phrase_map"]
         self.last_stats_season = self.season_map['last year']
-        self.player_aliases = MANIFEST.get("player_aliases", {})
+        self._alias_rev = _PLAYER_ALIAS_REV
+        # Exact-match only: near-identical questions (e.g. different seasons) need different plans
+        self.cache = DecisionCache()
 
         self.system_instruction = (
             "You are an NBA analytics *planner*.\n"
             "Return ONLY a JSON object matching this schema: "
             "{goal, dataset, timeframe:{season}, entities:{players[], teams[]}, metric_hint, notes[]}.\n"
-            f"Make sure the player names are correctly capitalized and listed as per the database. for example: Stephen Curry, LeBron James, Utilize the player aliases {self.player_aliases} if relevant to interpret the query. Make sure to list the correct player names"
+            "Make sure the player names are correctly capitalized and listed as per the database. for example: Stephen Curry, LeBron James. Utilize the player aliases given with the question (if any) to interpret nicknames. Make sure to list the correct player names.\n"
             f"Allowed datasets: {self.datasets}.\n"
             f"Metric names (hint list): {self.metric_keys}.\n"
-            f"Team aliases (keys=canonical, values=aliases): {self.team_aliases}.\n"
             "Prefer canonical full names for players and teams.\n"
             "Do NOT write SQL or execution steps."
             f"The player_stats, team_stats are only provided for the {self.last_stats_season} season. If no year is specified, assume that the query asks about {self.last_stats_season}. Refer to this map for further guidance: {self.season_map}. If a specific year is specified, use that"
@@ -107,22 +163,63 @@ class PlannerAgent:
         Returns a Python dict with keys:
         goal, dataset, timeframe.season, entities.players, entities.teams, metric_hint, notes.
         """
+        cached = self.cache.get(query)
+        if cached is not None:
+            return cached
+
         structured = self.llm.with_structured_output(Plan, method="function_calling")
-        draft: Plan = structured.invoke(
-            [
-                {"role": "system", "content": self.system_instruction},
-                {"role": "user", "content": f"Question: {query}"},
-            ]
-        )
+        draft: Plan = structured.invoke(self._messages(query))
+        plan = self._finalize(draft.dict(), query)
+        self.cache.put(query, plan)
+        return plan
 
-        plan = draft.dict()
+    def stream(self, query: str, history: list = None, **kwargs):
+        """
+        Yield pretty-printed JSON lines of the finalized plan (simple streaming for your UI).
+        """
+        result = self.invoke(query, history=history, **kwargs)
+        pretty = json.dumps(result, indent=2)
+        for line in pretty.splitlines(True):
+            yield line
 
+    def stream_draft(self, query: str):
+        """
+        Yield the plan JSON as the LLM generates it (raw tool-call argument deltas),
+        so a UI can show progress before the response completes.
+        The deltas are the unnormalized draft (aliases, seasons and defaults not resolved);
+        use invoke() or stream() for the final plan.
+        """
+        planner = self.llm.bind_tools([Plan], tool_choice="Plan")
+        for chunk in planner.stream(self._messages(query)):
+            for tool_chunk in chunk.tool_call_chunks:
+                if tool_chunk.get("args"):
+                    yield tool_chunk["args"]
+
+    # ---------- internals ----------
+    def _messages(self, query: str) -> List[Dict[str, str]]:
+        # Only the aliases this question mentions go to the LLM, not the whole alias table
+        user = f"Question: {query}"
+        aliases = _relevant_aliases(query)
+        if aliases:
+            user += f"\nPlayer aliases (alias -> player): {aliases}"
+        return [
+            {"role": "system", "content": self.system_instruction},
+            {"role": "user", "content": user},
+        ]
+
+    def _finalize(self, plan: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """
+        Deterministic normalization of the LLM draft: player aliases, season defaults, metric hint.
+        """
         # Normalize nicknames -> canonical player names
-        plan["entities"]["players"] = _resolve_players(plan["entities"].get("players", []), MANIFEST)
+        plan["entities"]["players"] = _resolve_players(plan["entities"].get("players", []), self._alias_rev)
+
+        # Team nicknames/abbreviations -> full team names
+        plan["entities"]["teams"] = _resolve_teams(plan["entities"].get("teams", []))
 
         # Season inference/defaults
         season = plan.get("timeframe", {}).get("season") or _resolve_season_from_text(query, MANIFEST)
-        print(f'The selected season is: {season}')
+        log.debug("selected season: %s", season)
         if not season:
             ds = plan.get("dataset")
             if ds == "player_contracts":
@@ -142,15 +239,6 @@ class PlannerAgent:
         plan.setdefault("notes", [])
         return plan
 
-    def stream(self, query: str, history: list = None, **kwargs):
-        """
-        Yield pretty-printed JSON lines (simple streaming for your UI).
-        """
-        result = self.invoke(query, history=history, **kwargs)
-        pretty = json.dumps(result, indent=2)
-        for line in pretty.splitlines(True):
-            yield line
-
 
 # Optional: CLI for quick testing
 if __name__ == "__main__":
@@ -1,120 +1,141 @@
 # src/agents/router_agent.py
 from __future__ import annotations
-import os, json
+import asyncio
+import os, re, json
 from typing import Any, Dict, List, Optional
 
+import orjson
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field, model_validator  # CHANGED: import model_validator
+from pydantic import BaseModel, ConfigDict, Field
 from config.settings import ROUTER_AGENT
 from src.capabilities.manifest import MANIFEST  # optional context
-from src.tools.tool_registry import ALL_TOOLS  # you already have this
+from src.common.cache import DecisionCache, payload_key
 
 load_dotenv()
 
+
+def _compact_json(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+# ---------- Template fast path ----------
+# Plan wording that asks for more than a per-entity lookup (ranking, comparison, league-wide aggregates)
+_AGGREGATE_INTENT_RE = re.compile(
+    r"\b(top|most|least|highest|lowest|best|worst|rank\w*|leader\w*|compar\w*|vs|versus|more|less|fewer|"
+    r"average|avg|mean|median|total|sum|league|count|how many|all|every|each)\b",
+    re.IGNORECASE,
+)
+_TABLE_COLUMNS = {name: frozenset(t.get("columns", [])) for name, t in MANIFEST.get("tables", {}).items()}
+_CAP_METRICS = {"cap", "cap_space", "salary"}
+# player_stats metrics a template may aggregate: numeric stat columns only (no ids, names, awards)
+_PLAYER_STAT_METRICS = _TABLE_COLUMNS["player_stats"] - {"player_id", "player", "team", "season", "awards"}
+# Per-row rates/attributes, averaged across a traded player's team rows; the rest are counts and are summed
+_PLAYER_AVG_METRICS = frozenset({"age"} | {c for c in _PLAYER_STAT_METRICS if c.endswith("_pct")})
+# team_stats metrics a template may aggregate: numeric stat columns only
+_TEAM_STAT_METRICS = _TABLE_COLUMNS["team_stats"] - {"team", "season"}
+
+def _template_args(plan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Tool args for a plain per-entity lookup ("Curry's salary in 2026-27", "Celtics 3P% last season"),
+    or None when the plan needs the LLM (ranking/compare intent, mixed entities, unknown metric).
+    """
+    dataset = plan.get("dataset")
+    season = (plan.get("timeframe") or {}).get("season")
+    entities = plan.get("entities") or {}
+    players, teams = entities.get("players") or [], entities.get("teams") or []
+    metric = plan.get("metric_hint")
+    intent = " ".join([plan.get("goal") or "", *(plan.get("notes") or [])])
+    if not season or _AGGREGATE_INTENT_RE.search(intent):
+        return None
+
+    if dataset == "player_contracts" and players and not teams and metric in (None, "salary"):
+        return {"season": season, "players": players, "metric": "salary", "agg": "max", "group_by": "player"}
+    if dataset == "player_stats" and players and not teams and metric in _PLAYER_STAT_METRICS:
+        # Traded players have one row per team: add up counting stats, average percentages and age
+        agg = "avg" if metric in _PLAYER_AVG_METRICS else "sum"
+        return {"season": season, "players": players, "metric": metric, "agg": agg, "group_by": "player"}
+    if dataset == "team_stats" and teams and not players and metric in _TEAM_STAT_METRICS:
+        return {"season": season, "teams": teams, "metric": metric, "agg": "avg", "group_by": "team"}
+    if dataset == "team_capsheets" and teams and not players and (metric or "cap") in _CAP_METRICS:
+        return {"season": season, "teams": teams, "metric": metric or "cap", "group_by": "team"}
+    return None
+
 # ---------- Output schema ----------
 class ToolOp(BaseModel):
+    # Frozen, plain types: validation stays in pydantic-core (no Python validators, args not deep-checked)
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     op: str = Field(description='Operation type; use "tool_call" for now', default="tool_call")
     tool_name: str = Field(description="Name of the tool to call (must be in allowed_tools)")
-    args: Dict[str, Any] = Field(default_factory=dict, description="Arguments JSON for the tool")
+    args: dict = Field(default_factory=dict, description="Arguments JSON for the tool")
 
 class RoutePlan(BaseModel):
-    ops: List[ToolOp] = Field(default_factory=list)
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
-    @model_validator(mode="after")
-    def _non_empty_ops(self):
-        if not self.ops:
-            raise ValueError("ops must not be empty")
-        return self
+    # min_length rejects an empty op list inside the core validator
+    ops: List[ToolOp] = Field(..., min_length=1)
 
 # ---------- Router Agent ----------
 class RouterAgent:
     """
     Turns a planner Plan into an executable op list:
-    - Chooses tool(s) from ALL_TOOLS based on dataset/intent
-    - Crafts args from entities / timeframe / metric_hint
-    - Returns RoutePlan.ops = [{op, tool_name, args}, ...]
+    - The compute tools are bound as native OpenAI tools (typed args schemas), so the
+      model picks the tool(s) and fills their args in one tool-calling step
+    - Returns RoutePlan.ops = [{op, tool_name, args}, ...], one op per tool call
+    - Plain per-entity lookups skip the LLM: their single op is filled from a template
     """
 
     def __init__(self):
+        # Deferred imports: the LLM client and tool plumbing load with the first agent,
+        # not when the module is imported for RoutePlan/ToolOp
+        from langchain_openai import ChatOpenAI
+        from src.tools.tool_registry import ALL_TOOLS, COMPUTE_TOOLS
+
         # The LLM that maps a Plan -> ops list
         self.llm = ChatOpenAI(
             temperature=0,
             model=ROUTER_AGENT,
             api_key=os.getenv("OPEN_AI_KEY"),
         )
+        # Each compute tool is its own OpenAI tool; the model must call at least one
+        self._tool_llm = self.llm.bind_tools(COMPUTE_TOOLS, tool_choice="required")
 
-        # Build a tiny catalog the model can "see"
-        # Map dataset -> tool_name (adjust to your actual tool names)
+        # Map dataset -> tool_name (the model sees this as a hint; also used as the guardrail fallback)
         self.dataset_to_tool = {
             "player_stats": "player_stats_aggregate_tool",
             "team_stats": "team_stats_aggregate_tool",
-            "player_contracts": "contracts_aggregate_tool",
+            "player_contracts": "contracts_aggregate",
             "team_picks": "team_picks_aggregate_tool",
-            "team_capsheets": "team_capsheets_aggregate_tool",
+            "team_capsheets": "team_capsheets_aggregate",
         }
 
         # Derive allowed tool names from your registry to gate LLM output
         self.allowed_tools = sorted({t.name for t in ALL_TOOLS})  # assumes each tool has .name
-
-        # Brief arg “shapes” to guide the LLM (now with aggregates)
-        self.tool_arg_hints = {
-            # Retrieval + optional aggregation on metrics
-            "player_stats_aggregate_tool": {
-                "season": "YYYY-YY",
-                "players": ["..."],
-                "teams": ["..."],
-                "metrics": ["..."],            # e.g., ["points", "ast", "ts%"]
-                "agg": "avg|sum|count|min|max|median|pXX",  # choose ONE; pXX = percentile like p90
-                "group_by": ["team|player|position|none"],  # optional; omit if not needed
-                "k": 20                                     # optional top-k
-            },
-            "team_stats_aggregate_tool": {
-                "season": "YYYY-YY",
-                "teams": ["..."],
-                "metrics": ["..."],
-                "agg": "avg|sum|count|min|max|median|pXX",
-                "group_by": ["team|division|conference|none"],
-                "k": 20
-            },
-            # Contracts/salary analytics; allow season as YYYY or YYYY-YY (your executor can normalize)
-            "contracts_aggregate_tool": {
-                "season": "YYYY or YYYY-YY",
-                "players": ["..."],
-                "teams": ["..."],
-                "metric": "salary|cap_hit|guaranteed|aav",  # pick ONE metric
-                "agg": "avg|sum|count|min|max|median|pXX",  # choose ONE aggregate
-                "group_by": ["team|none"],                  # optional
-            },
-            "team_picks_aggregate_tool": {
-                "teams": ["..."],
-                "season": "YYYY-YY",
-                "agg": "count|none",                        # usually counts
-                "group_by": ["team|round|none"],
-            },
-            "team_capsheets_aggregate_tool": {
-                "teams": ["..."],
-                "season": "YYYY-YY",
-                "metric": "cap_space",
-                "agg": "avg|sum|min|max|none",
-                "group_by": ["team|none"],
-                "limit": 50
-            },
-        }
+        self._allowed_tools_set = frozenset(self.allowed_tools)
+        # Pick something safe/deterministic for the guardrail, once
+        self._fallback = (
+            "player_stats_aggregate_tool" if "player_stats_aggregate_tool" in self._allowed_tools_set
+            else (self.allowed_tools[0] if self.allowed_tools else "unknown_tool")
+        )
 
         self.player_aliases = MANIFEST.get("player_aliases", {})
         self.team_aliases = MANIFEST.get("team_aliases", {})
 
-        # Lightweight router instruction (emphasize aggregates)
-        self.system_instruction = (
-            "You are an OP router for an NBA analytics system.\n"
-            f"Allowed tools: {self.allowed_tools}.\n"
-            f"Dataset→tool: {self.dataset_to_tool}.\n"
-            f"Arg hints: {self.tool_arg_hints}.\n"
-            "Return JSON: {ops:[{op:'tool_call', tool_name:'<allowed>', args:{...}}]}.\n"
-            f"Match the player names to exactly what the correct capitalization would be in the database, for example: LeBron James, Giannis Antetokounmpo. Utilize the player aliases {self.player_aliases} if relevant to interpret the input. Make sure to list the correct player names."
-            f"Match team names to the canonical names in the database, e.g. 'Los Angeles Lakers' not 'Lakers'. Utilize the team aliases {self.team_aliases} if relevant to interpret the input. Make sure to list the correct team names."
-        )
+        # Lightweight router instruction (emphasize aggregates). Built once from static content only,
+        # with maps as minified JSON, so every call sends a byte-identical prefix (prompt-cache friendly);
+        # the per-call plan goes in the user message.
+        self.system_instruction = "\n".join([
+            "You are an OP router for an NBA analytics system.",
+            "Call the tool(s) that answer the plan, one call per needed operation; fill args from the plan.",
+            "Dataset→tool: " + _compact_json(self.dataset_to_tool),
+            "Match the player names to exactly what the correct capitalization would be in the database, for example: LeBron James, Giannis Antetokounmpo. "
+            "Utilize the player aliases " + _compact_json(self.player_aliases) + " if relevant to interpret the input. Make sure to list the correct player names.",
+            "Match team names to the canonical names in the database, e.g. 'Los Angeles Lakers' not 'Lakers'. "
+            "Utilize the team aliases " + _compact_json(self.team_aliases) + " if relevant to interpret the input. Make sure to list the correct team names.",
+        ])
+        self._system_msg = {"role": "system", "content": self.system_instruction}
+        # Exact-match cache of routed ops per (model, prompt, plan); only sound for deterministic output
+        self.cache = DecisionCache() if self.llm.temperature == 0 else None
 
 
     # ---------- public API ----------
@@ -122,44 +143,87 @@ class RouterAgent:
         """
         Convert a Plan dict into {ops: [...]}.
         """
-        # Choose structured output via function_calling to avoid pydantic v1 warnings
-        structured = self.llm.with_structured_output(RoutePlan, method="function_calling")
+        templated = self._template_ops(plan)
+        if templated is not None:
+            return templated
 
-        # Minimal normalization/safety: pick a suggested tool if dataset present
-        suggested_tool = None
-        dataset = (plan.get("dataset") or "").strip()
-        if dataset in self.dataset_to_tool:
-            suggested_tool = self.dataset_to_tool[dataset]
-
-        messages = [
-            {"role": "system", "content": self.system_instruction},
-            {"role": "user", "content": json.dumps({"plan": plan, "suggested_tool": suggested_tool}, ensure_ascii=False)},
-        ]
-        route: RoutePlan = structured.invoke(messages)
-
-        # Post-check: ensure tool_name is allowed
-        for op in route.ops:
-            if op.tool_name not in self.allowed_tools:
-                # hard guardrail: replace with suggested or first allowed to avoid executor blowups
-                op.tool_name = suggested_tool or self._fallback_tool()
-        return route.dict()
+        key = payload_key(ROUTER_AGENT, self.system_instruction, plan)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        msg = self._tool_llm.invoke(self._messages(plan))
+        return self._finalize(key, plan, msg)
+
+    async def ainvoke(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async invoke: same result, but the LLM call does not block the event loop.
+        """
+        templated = self._template_ops(plan)
+        if templated is not None:
+            return templated
+
+        key = payload_key(ROUTER_AGENT, self.system_instruction, plan)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        msg = await self._tool_llm.ainvoke(self._messages(plan))
+        return self._finalize(key, plan, msg)
+
+    async def ainvoke_many(self, plans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Route several plans concurrently; results keep the order of `plans`.
+        """
+        return list(await asyncio.gather(*(self.ainvoke(plan) for plan in plans)))
 
     def stream(self, plan: Dict[str, Any]):
         result = self.invoke(plan)
-        import json as _json
-        pretty = _json.dumps(result, indent=2)
+        pretty = json.dumps(result, indent=2)
         for line in pretty.splitlines(True):
             yield line
 
     # ---------- helpers ----------
-    def _fallback_tool(self) -> str:
-        # Pick something safe/deterministic
-        return "player_stats_aggregate_tool" if "player_stats_aggregate_tool" in self.allowed_tools else (self.allowed_tools[0] if self.allowed_tools else "unknown_tool")
+    def _suggested_tool(self, plan: Dict[str, Any]) -> Optional[str]:
+        # Minimal normalization/safety: pick a suggested tool if dataset present
+        dataset = (plan.get("dataset") or "").strip()
+        return self.dataset_to_tool.get(dataset)
+
+    def _template_ops(self, plan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Single-dataset entity lookups map to one tool call without an LLM round-trip
+        tool = self._suggested_tool(plan)
+        args = _template_args(plan) if tool in self._allowed_tools_set else None
+        if args is None:
+            return None
+        return RoutePlan(ops=[ToolOp(op="tool_call", tool_name=tool, args=args)]).model_dump()
+
+    def _messages(self, plan: Dict[str, Any]) -> List[Dict[str, str]]:
+        user = orjson.dumps({"plan": plan, "suggested_tool": self._suggested_tool(plan)}).decode()
+        return [self._system_msg, {"role": "user", "content": user}]
+
+    def _finalize(self, key: str, plan: Dict[str, Any], msg: Any) -> Dict[str, Any]:
+        # One op per tool call (RoutePlan rejects an empty op list).
+        # Post-check: ensure tool_name is allowed; hard guardrail: replace with suggested or
+        # first allowed to avoid executor blowups
+        route = RoutePlan(ops=[
+            ToolOp(
+                op="tool_call",
+                tool_name=call["name"] if call["name"] in self._allowed_tools_set
+                else self._suggested_tool(plan) or self._fallback,
+                args=call.get("args") or {},
+            )
+            for call in getattr(msg, "tool_calls", None) or []
+        ])
+        ops = route.model_dump()
+        if self.cache is not None:
+            self.cache.put(key, ops)
+        return ops
 
 
 # --- at the bottom of src/agents/router_agent.py ---
 if __name__ == "__main__":
-    import json
     from src.agents.planner_agent import PlannerAgent  # 1) import PlannerAgent first
 
     planner = PlannerAgent()
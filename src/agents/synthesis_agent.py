@@ -1,17 +1,33 @@
 # src/agents/synthesis_agent.py
 from __future__ import annotations
-import os, json, traceback
-from typing import Any, Dict, List, Optional, Iterable
+import asyncio
+import os, traceback
+from io import StringIO
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Iterable
 
+import orjson
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_core.runnables import Runnable
+from src.common.cache import DecisionCache, payload_key
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
 
 load_dotenv()
 
 # Model name via env var (fallback)
 MODEL_NAME = os.getenv("SYNTHESIS_AGENT_MODEL", "gpt-4o-mini")
 
+# orjson (C) for the prompt payloads; numpy scalars and non-str keys from tool outputs are allowed
+_PROMPT_JSON_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Fallback-table cell formatting by exact type
+_CELL_FORMATTERS = {
+    type(None): lambda v: "—",
+    float: lambda v: f"{v:,.4g}",
+    int: lambda v: f"{v:,}",
+    str: str,
+}
+
 
 class OutputSynthesisAgent:
     """
@@ -20,8 +36,11 @@ class OutputSynthesisAgent:
     """
 
     def __init__(self, model: Optional[str] = None, temperature: float = 0.0):
+        from langchain_openai import ChatOpenAI  # deferred: loads with the first agent, not on import
+
+        self.model = model or MODEL_NAME
         self.llm: Runnable = ChatOpenAI(
-            model=model or MODEL_NAME,
+            model=self.model,
             temperature=temperature,
             api_key=os.getenv("OPEN_AI_KEY"),
         )
@@ -41,6 +60,8 @@ class OutputSynthesisAgent:
         self.plan_hint = (
             "Plan is intent guidance only. If plan conflicts with tool outputs, trust tool outputs.\n"
         )
+        # Exact-match cache of answers per (model, prompt, question, results, plan); temperature 0 only
+        self.cache = DecisionCache() if temperature == 0 else None
 
     # ---------- Public API ----------
     def invoke(
@@ -53,22 +74,63 @@ class OutputSynthesisAgent:
         """
         Returns Markdown answer. Falls back to deterministic rendering on failure.
         """
+        key = payload_key(self.model, self.system_instruction, question, results, plan)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
         try:
-            prompt = self._build_user_message(question, results, plan)
-            resp = self.llm.invoke(
-                [
-                    {"role": "system", "content": self.system_instruction},
-                    {"role": "user", "content": prompt},
-                ]
-            )
-            text = getattr(resp, "content", "") or str(resp)
-            if self._looks_markdown(text):
-                return text.strip()
+            resp = self.llm.invoke(self._messages(question, results, plan))
+            answer = self._accept(key, resp)
+            if answer is not None:
+                return answer
         except Exception:
             # Log (optional); in production you might route to logging infra
             traceback.print_exc()
         return self._fallback_markdown(question, results, plan)
 
+    async def ainvoke(
+        self,
+        question: str,
+        results: List[Dict[str, Any]],
+        plan: Optional[Dict[str, Any]] = None,
+        **_: Any,
+    ) -> str:
+        """
+        Async invoke: same answer and fallback, without blocking the event loop on the LLM call.
+        """
+        key = payload_key(self.model, self.system_instruction, question, results, plan)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            resp = await self.llm.ainvoke(self._messages(question, results, plan))
+            answer = self._accept(key, resp)
+            if answer is not None:
+                return answer
+        except Exception:
+            traceback.print_exc()
+        return self._fallback_markdown(question, results, plan)
+
+    async def abatch(
+        self,
+        questions: List[str],
+        results_list: List[List[Dict[str, Any]]],
+        plans: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> List[str]:
+        """
+        Synthesize several answers concurrently; answers keep the order of `questions`.
+        """
+        plans = plans or [None] * len(questions)
+        return list(
+            await asyncio.gather(
+                *(self.ainvoke(q, r, p) for q, r, p in zip(questions, results_list, plans))
+            )
+        )
+
     def stream(
         self,
         question: str,
@@ -76,17 +138,62 @@ class OutputSynthesisAgent:
         plan: Optional[Dict[str, Any]] = None,
         **kwargs: Any,
     ) -> Iterable[str]:
-        """Simple line streaming of final answer."""
-        final = self.invoke(question, results, plan, **kwargs)
-        for line in final.splitlines(True):
-            yield line
+        """
+        Yield the answer as the LLM produces it (token chunks), so the first words show up
+        before the whole answer is done. Falls back to deterministic rendering on failure; a
+        failure mid-answer appends an "interrupted" notice and that rendering.
+        """
+        key = payload_key(self.model, self.system_instruction, question, results, plan)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts: List[str] = []
+        try:
+            for chunk in self.llm.stream(self._messages(question, results, plan)):
+                text = getattr(chunk, "content", "") or ""
+                if text:
+                    parts.append(text)
+                    yield text
+        except Exception:
+            traceback.print_exc()
+            if parts:
+                # Partial answer already shown: flag the cut and append the raw results; don't cache it
+                yield "\n\n_Answer interrupted; raw results below._\n\n"
+                yield self._fallback_markdown(question, results, plan)
+                return
+        if parts:
+            answer = "".join(parts).strip()
+            if answer and self.cache is not None:
+                self.cache.put(key, answer)
+        else:
+            yield self._fallback_markdown(question, results, plan)
 
     # ---------- Internal helpers ----------
+    def _messages(
+        self, question: str, results: List[Dict[str, Any]], plan: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_instruction},
+            {"role": "user", "content": self._build_user_message(question, results, plan)},
+        ]
+
+    def _accept(self, key: str, resp: Any) -> Optional[str]:
+        # LLM text -> answer (cached), or None to use the deterministic fallback
+        answer = (getattr(resp, "content", "") or "").strip()
+        if not answer:
+            return None
+        if self.cache is not None:
+            self.cache.put(key, answer)
+        return answer
+
     def _build_user_message(
         self, question: str, results: List[Dict[str, Any]], plan: Optional[Dict[str, Any]]
     ) -> str:
-        plan_json = json.dumps(plan or {}, ensure_ascii=False, indent=2)
-        results_json = json.dumps(results or [], ensure_ascii=False, indent=2)
+        plan_json = orjson.dumps(plan or {}, option=_PROMPT_JSON_OPTS).decode()
+        results_json = orjson.dumps(results or [], option=_PROMPT_JSON_OPTS, default=str).decode()
 
         template_hint = (
             "Return ONLY Markdown.\n"
@@ -108,10 +215,6 @@ class OutputSynthesisAgent:
             # f"{template_hint}"
         )
 
-    def _looks_markdown(self, text: str) -> bool:
-        t = (text or "").lstrip()
-        return t
-
     def _fallback_markdown(
         self, question: str, results: List[Dict[str, Any]], plan: Optional[Dict[str, Any]]
     ) -> str:
@@ -157,18 +260,17 @@ class OutputSynthesisAgent:
                 return ["_No rows._"]
             first = out[0]
             if isinstance(first, dict):
+                # One buffer for the whole table instead of a list of per-row strings
                 headers = list(first.keys())[:10]
-                rows_md = [
-                    "| " + " | ".join(headers) + " |",
-                    "| " + " | ".join(["---"] * len(headers)) + " |",
-                ]
+                fmt = self._fmt
+                buf = StringIO()
+                buf.write("| " + " | ".join(headers) + " |\n")
+                buf.write("| " + " | ".join(["---"] * len(headers)) + " |")
                 for row in out[:12]:
-                    rows_md.append(
-                        "| " + " | ".join(self._fmt(row.get(h)) for h in headers) + " |"
-                    )
+                    buf.write("\n| " + " | ".join([fmt(row.get(h)) for h in headers]) + " |")
                 if len(out) > 12:
-                    rows_md.append(f"_… {len(out)-12} more rows_")
-                return rows_md
+                    buf.write(f"\n_… {len(out)-12} more rows_")
+                return [buf.getvalue()]
             # list of scalars
             return [f"- {self._fmt(v)}" for v in out[:25]] + (
                 [f"_… {len(out)-25} more items_"] if len(out) > 25 else []
@@ -177,6 +279,10 @@ class OutputSynthesisAgent:
         return [str(out)]
 
     def _fmt(self, v: Any) -> str:
+        # Exact-type fast path for the common cell types; subclasses (bool, numpy) take the checks below
+        fast = _CELL_FORMATTERS.get(type(v))
+        if fast is not None:
+            return fast(v)
         if v is None:
             return "—"
         if isinstance(v, float):
@@ -205,4 +311,6 @@ if __name__ == "__main__":
     ]
 
     print("=== Synthesized Answer ===\n")
-    print(agent.invoke(sample_question, sample_results, sample_plan))
\ No newline at end of file
+    for text in agent.stream(sample_question, sample_results, sample_plan):
+        print(text, end="", flush=True)
+    print()
\ No newline at end of file
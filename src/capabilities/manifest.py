@@ -1,4 +1,8 @@
 # Everything the LLM planners may need lives here.
+import re
+from types import MappingProxyType
+from typing import Dict, List, Mapping
+
 MANIFEST = {
   "tables": {
     "player_stats": {
@@ -101,3 +105,19 @@ MANIFEST = {
     "team_picks": "Textual future pick obligations and swaps."
   }
 }
+
+
+# ---------- Reverse alias maps (built once at import) ----------
+_WS_RE = re.compile(r"\s+")
+
+def _build_alias_rev(aliases: Dict[str, List[str]]) -> Dict[str, str]:
+    """lowercased, whitespace-collapsed alias (or canonical name) -> canonical name"""
+    return {
+        _WS_RE.sub(" ", alt.strip().lower()): canon
+        for canon, alts in aliases.items()
+        for alt in [canon, *alts]
+    }
+
+# Read-only alias -> canonical lookups: one dict probe instead of scanning every alias list
+PLAYER_ALIAS_REV: Mapping[str, str] = MappingProxyType(_build_alias_rev(MANIFEST["player_aliases"]))
+TEAM_ALIAS_REV: Mapping[str, str] = MappingProxyType(_build_alias_rev(MANIFEST["team_aliases"]))
@@ -0,0 +1,60 @@
+# src/common/cache.py
+"""
+Question -> decision cache shared by the LLM agents (orchestrator, planner, router, synthesis),
+the retriever tools and the executor.
+
+Exact match on the normalized question (lowercased, whitespace collapsed), LRU-bounded.
+Callers whose input is structured (router plan, synthesis results) key the cache with
+payload_key(...) instead of the raw question.
+
+Values are stored as JSON strings, so every hit returns a fresh copy callers may mutate.
+Agents and tools are shared by every session thread, so get/put hold a lock.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    return _WS_RE.sub(" ", question.strip().lower())
+
+
+def payload_key(*parts: Any) -> str:
+    """SHA-256 of the JSON-serialized parts (exact-match key for structured LLM inputs)."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class DecisionCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._exact: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, question: str) -> Optional[Any]:
+        key = normalize_question(question)
+        with self._lock:
+            hit = self._exact.get(key)
+            if hit is None:
+                return None
+            self._exact.move_to_end(key)
+        return json.loads(hit)
+
+    def put(self, question: str, value: Any) -> None:
+        key = normalize_question(question)
+        blob = json.dumps(value)
+        with self._lock:
+            self._exact[key] = blob
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.maxsize:
+                self._exact.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
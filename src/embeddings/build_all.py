@@ -0,0 +1,40 @@
+# src/embeddings/build_all.py
+"""
+Rebuild every vectorstore concurrently under one event loop.
+The datasets share no state and are bound by embedding API latency, so the total
+rebuild takes roughly as long as the slowest dataset.
+
+    python -m src.embeddings.build_all
+"""
+import asyncio
+import logging
+
+from src.embeddings import player_contracts, player_stats, team_capsheets, team_picks, team_stats
+
+BUILDERS = {
+    "player_contracts": player_contracts.abuild,
+    "player_stats": player_stats.abuild,
+    "team_capsheets": team_capsheets.abuild,
+    "team_picks": team_picks.abuild,
+    "team_stats": team_stats.abuild,
+}
+MAX_CONCURRENT_BUILDS = 5
+
+
+async def abuild_all() -> None:
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_BUILDS)
+
+    async def _build(abuild) -> None:
+        async with semaphore:
+            await abuild()
+
+    await asyncio.gather(*(_build(abuild) for abuild in BUILDERS.values()))
+
+
+def build_all() -> None:
+    asyncio.run(abuild_all())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_all()
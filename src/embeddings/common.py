@@ -0,0 +1,139 @@
+# src/embeddings/common.py
+"""
+Shared helpers for the vector-store build scripts in src/embeddings.
+"""
+import asyncio
+import hashlib
+import uuid
+from typing import List, Optional, Sequence
+
+import faiss
+import numpy as np
+import pandas as pd
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from config import settings
+
+# Concurrent embedding requests: texts are split into EMBED_SLICES batches,
+# at most EMBED_CONCURRENCY of which are in flight at once (OpenAI rate limits).
+EMBED_SLICES = 16
+EMBED_CONCURRENCY = 8
+
+# HNSW graph parameters (neighbours per node, build-time candidate list).
+# Query-time efSearch lives in settings.HNSW_EF_SEARCH.
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+
+
+def read_text_columns(path: str, columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Read `columns` from a Parquet file as Arrow-backed strings (numbers rendered as text),
+    with nulls as "", ready for whole-column string concatenation.
+    """
+    df = pd.read_parquet(path, columns=list(columns), engine="pyarrow", dtype_backend="pyarrow")
+    return df.astype("string[pyarrow]").fillna("")
+
+
+def cached_embeddings(embedding_model: Embeddings, namespace: str) -> CacheBackedEmbeddings:
+    """
+    Wrap `embedding_model` so document vectors are cached on disk by content hash.
+    Unchanged rows are served from the cache on rebuilds (no API call).
+    """
+    store = LocalFileStore(settings.EMBEDDING_CACHE_DIR)
+    return CacheBackedEmbeddings.from_bytes_store(
+        embedding_model,
+        store,
+        namespace=namespace,
+        key_encoder="sha256",
+    )
+
+
+def dedupe_documents(documents: Sequence[Document]) -> List[Document]:
+    """
+    Drop documents whose page_content repeats an earlier one (first occurrence wins),
+    so identical rows are embedded and indexed once.
+    """
+    seen = set()
+    unique = []
+    for doc in documents:
+        digest = hashlib.blake2b(doc.page_content.encode("utf-8"), digest_size=16).digest()
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(doc)
+    return unique
+
+
+async def aembed_texts(
+    embedding_model: Embeddings,
+    texts: Sequence[str],
+    n_slices: int = EMBED_SLICES,
+    concurrency: int = EMBED_CONCURRENCY,
+) -> List[List[float]]:
+    """
+    Embed `texts` with concurrent aembed_documents calls; vectors keep input order.
+    """
+    if not texts:
+        return []
+    texts = list(texts)
+    size = -(-len(texts) // n_slices)  # ceil division
+    batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _embed(batch: List[str]) -> List[List[float]]:
+        async with semaphore:
+            return await embedding_model.aembed_documents(batch)
+
+    results = await asyncio.gather(*(_embed(batch) for batch in batches))
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+
+def build_hnsw_vectorstore(
+    embedding_model: Embeddings,
+    texts: Sequence[str],
+    vectors: Sequence[Sequence[float]],
+    metadatas: Optional[Sequence[dict]] = None,
+) -> FAISS:
+    """
+    Index precomputed vectors in an IndexHNSWFlat (L2, like the default flat index)
+    and wrap it in a LangChain FAISS vectorstore.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    index = faiss.IndexHNSWFlat(matrix.shape[1], HNSW_M)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.hnsw.efSearch = settings.HNSW_EF_SEARCH
+    index.add(matrix)
+
+    metadatas = metadatas or [{} for _ in texts]
+    ids = [str(uuid.uuid4()) for _ in texts]
+    docstore = InMemoryDocstore({
+        doc_id: Document(page_content=text, metadata=metadata)
+        for doc_id, text, metadata in zip(ids, texts, metadatas)
+    })
+    return FAISS(
+        embedding_function=embedding_model,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=dict(enumerate(ids)),
+    )
+
+
+def quantize_index(index: faiss.Index) -> faiss.Index:
+    """
+    Copy of `index` with int8 scalar-quantized vectors (~4x smaller, same row order, so the
+    docstore mapping still holds). HNSW indexes stay HNSW (IndexHNSWSQ); flat ones become
+    IndexScalarQuantizer.
+    """
+    vectors = index.reconstruct_n(0, index.ntotal)
+    if hasattr(index, "hnsw"):
+        quantized = faiss.IndexHNSWSQ(index.d, faiss.ScalarQuantizer.QT_8bit, HNSW_M)
+        quantized.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        quantized.hnsw.efSearch = settings.HNSW_EF_SEARCH
+    else:
+        quantized = faiss.IndexScalarQuantizer(index.d, faiss.ScalarQuantizer.QT_8bit, index.metric_type)
+    quantized.train(vectors)  # per-dimension min/max only; fine for a few dozen rows
+    quantized.add(vectors)
+    return quantized
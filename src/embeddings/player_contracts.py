@@ -1,57 +1,96 @@
+import asyncio
+import logging
 import os
+from typing import List
 import pandas as pd
 from dotenv import load_dotenv
 #from langchain.vectorstores import FAISS
-from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
+from src.embeddings.common import (
+    aembed_texts,
+    build_hnsw_vectorstore,
+    cached_embeddings,
+    dedupe_documents,
+)
+from src.embeddings.vectorstore_io import save_vectorstore
+from src.parquet_builders.raw_csv import ensure_raw_parquet
 from config import settings  # ✅ central config
 
 # Load environment variables
 load_dotenv()
+log = logging.getLogger(__name__)
 
 # === Config ===
-DATA_PATH = settings.DATASETS["player_contracts"]
-VECTORSTORE_DIR = settings.INDEX_PATHS["player_contracts"]
+DATA_PATH = settings.PLAYER_CONTRACTS_RAW_PARQUET
+VECTORSTORE_DIR = settings.PLAYER_CONTRACTS_INDEX
 EMBEDDING_MODEL = settings.EMBEDDING_MODEL
 
-# === Load Data ===
-df = pd.read_csv(DATA_PATH).fillna("")
 
-# === Construct Documents ===
-documents = []
+def load_documents() -> List[Document]:
+    # === Load Data ===
+    # Read the Parquet snapshot of the raw CSV (rebuilt by src/parquet_builders/raw_csv.py when the CSV changes),
+    # loading only the columns the documents use.
+    ensure_raw_parquet("player_contracts")
+    salary_cols = [f"Salary.{i}" for i in range(1, 6)]
+    df = pd.read_parquet(
+        DATA_PATH,
+        columns=["name", "team", "Note", "Salary", *salary_cols],
+        dtype_backend="pyarrow",
+    ).fillna("")
 
+    # === Construct Documents ===
+    # Build every page_content string with vectorized column ops instead of iterrows().
+    # Line breaks keep the same 4-space indentation the indexed documents have always had.
+    salaries = pd.Series("", index=df.index)
+    for col in salary_cols:
+        salaries += df[col].where(df[col] == "", df[col] + ", ")
+    salaries = salaries.str.removesuffix(", ")
+    salary_str = salaries.where(salaries != "", df["Salary"])
 
-for _, row in df.iterrows():
-    name = row["name"]
-    team = row["team"]
-    note = row["Note"]
+    contents = (
+        "Player: " + df["name"]
+        + "\n    Team: " + df["team"]
+        + "\n    Contract: " + salary_str
+        + "\n    Notes: " + df["Note"]
+    ).str.strip().tolist()
 
-    salaries = [row[f"Salary.{i}"] for i in range(6) if f"Salary.{i}" in row and row[f"Salary.{i}"] != ""]
-    salary_str = ", ".join(salaries) if salaries else row["Salary"]
+    documents = [
+        Document(page_content=content, metadata={"player": name, "team": team})
+        for content, name, team in zip(contents, df["name"], df["team"])
+    ]
+    # Identical rows would only add duplicate vectors; embed each distinct document once.
+    return dedupe_documents(documents)
 
-    content = f"""
-    Player: {name}
-    Team: {team}
-    Contract: {salary_str}
-    Notes: {note}
-    """.strip()
 
-    metadata = {
-        "player": name,
-        "team": team,
-    }
+async def abuild() -> None:
+    documents = load_documents()
 
-    documents.append(Document(page_content=content, metadata=metadata))
+    # === Create Embeddings ===
+    # Embed all texts up front with concurrent batched requests (cached on disk by content hash),
+    # then index the precomputed vectors in an HNSW graph.
+    embedding_model = OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        api_key=os.getenv("OPEN_AI_KEY"),
+        chunk_size=2048,
+        max_retries=6,
+    )
+    texts = [doc.page_content for doc in documents]
+    metadatas = [doc.metadata for doc in documents]
+    vectors = await aembed_texts(cached_embeddings(embedding_model, namespace=EMBEDDING_MODEL), texts)
+    vectorstore = build_hnsw_vectorstore(embedding_model, texts, vectors, metadatas)
 
+    # === Save Vectorstore ===
+    save_vectorstore(vectorstore, VECTORSTORE_DIR)
 
-# === Create Embeddings ===
-embedding_model = OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=os.getenv("OPEN_AI_KEY"))
-vectorstore = FAISS.from_documents(documents, embedding_model)
+    log.info("Player contract index built and saved to %s", VECTORSTORE_DIR)
 
-# === Save Vectorstore ===
-os.makedirs(VECTORSTORE_DIR, exist_ok=True)
-vectorstore.save_local(VECTORSTORE_DIR)
 
-print(f"Player contract index built and saved to {VECTORSTORE_DIR}")
+def build() -> None:
+    asyncio.run(abuild())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build()
@@ -1,61 +1,85 @@
-import pandas as pd
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import OpenAIEmbeddings
+from typing import List
 from langchain.docstore.document import Document
+from src.embeddings.common import (
+    aembed_texts,
+    build_hnsw_vectorstore,
+    cached_embeddings,
+    dedupe_documents,
+    read_text_columns,
+)
+from src.embeddings.vectorstore_io import save_vectorstore
+from src.parquet_builders.raw_csv import ensure_raw_parquet
 from config import settings  # your centralized config
 
 # === Load API Key ===
 load_dotenv()
+log = logging.getLogger(__name__)
 
 # === Config ===
-DATA_PATH = settings.DATASETS["player_stats"]
-VECTORSTORE_DIR = settings.INDEX_PATHS["player_stats"]
+DATA_PATH = settings.PLAYER_STATS_RAW_PARQUET
+VECTORSTORE_DIR = settings.PLAYER_STATS_INDEX
 MODEL_NAME = settings.EMBEDDING_MODEL
+USECOLS = ["Player", "Team", "Age", "G", "PTS", "AST", "TRB", "Awards"]
 
-# === Load Data ===
-df = pd.read_csv(DATA_PATH)
-df = df.fillna("")  # fill missing values
-
-# === Build Documents ===
-documents = []
-
-for _, row in df.iterrows():
-    name = row["Player"]
-    team = row["Team"]
-    age = row["Age"]
-    games = row["G"]
-    points = row["PTS"]
-    assists = row["AST"]
-    rebounds = row["TRB"]
-    awards = row["Awards"]
-    
-    # Build the readable content
-    content = f"""
-    Player: {name}
-    Team: {team}
-    Age: {age}
-    Games Played: {games}
-    Points: {points}
-    Assists: {assists}
-    Rebounds: {rebounds}
-    Awards: {awards}
-    """.strip()
-
-    metadata = {
-        "player": name,
-        "team": team,
-    }
-
-    documents.append(Document(page_content=content, metadata=metadata))
-
-# === Create Vector Store ===
-embedding_model = OpenAIEmbeddings(model=MODEL_NAME, api_key=os.getenv("OPEN_AI_KEY"))
-vectorstore = FAISS.from_documents(documents, embedding_model)
-
-# === Save to Disk ===
-os.makedirs(VECTORSTORE_DIR, exist_ok=True)
-vectorstore.save_local(VECTORSTORE_DIR)
-
-print(f"Player stats index built and saved to {VECTORSTORE_DIR}")
+
+def load_documents() -> List[Document]:
+    # === Load Data ===
+    # Read the Parquet snapshot of the raw CSV (rebuilt by src/parquet_builders/raw_csv.py when the CSV changes),
+    # loading only the columns used below, as Arrow strings with blanks as "".
+    ensure_raw_parquet("player_stats")
+    df = read_text_columns(DATA_PATH, USECOLS)
+
+    # === Build Documents ===
+    # Whole-column string ops instead of iterrows(); same text as the original per-row template.
+    contents = (
+        "Player: " + df["Player"]
+        + "\n    Team: " + df["Team"]
+        + "\n    Age: " + df["Age"]
+        + "\n    Games Played: " + df["G"]
+        + "\n    Points: " + df["PTS"]
+        + "\n    Assists: " + df["AST"]
+        + "\n    Rebounds: " + df["TRB"]
+        + "\n    Awards: " + df["Awards"]
+    ).str.strip().tolist()
+    metadatas = df[["Player", "Team"]].rename(columns={"Player": "player", "Team": "team"}).to_dict("records")
+    documents = [Document(page_content=c, metadata=m) for c, m in zip(contents, metadatas)]
+    # Identical rows would only add duplicate vectors; embed each distinct document once.
+    return dedupe_documents(documents)
+
+
+async def abuild() -> None:
+    documents = load_documents()
+
+    # === Create Vector Store ===
+    # Large request batches, sent concurrently, instead of afrom_documents' small default chunks.
+    # Vectors are cached on disk by content hash, so rebuilds only embed rows that changed;
+    # the precomputed vectors are then indexed in an HNSW graph.
+    embedding_model = OpenAIEmbeddings(
+        model=MODEL_NAME,
+        api_key=os.getenv("OPEN_AI_KEY"),
+        chunk_size=2048,
+        max_retries=6,
+    )
+    texts = [doc.page_content for doc in documents]
+    metadatas = [doc.metadata for doc in documents]
+    vectors = await aembed_texts(cached_embeddings(embedding_model, namespace=MODEL_NAME), texts)
+    vectorstore = build_hnsw_vectorstore(embedding_model, texts, vectors, metadatas)
+
+    # === Save to Disk ===
+    save_vectorstore(vectorstore, VECTORSTORE_DIR)
+
+    log.info("Player stats index built and saved to %s", VECTORSTORE_DIR)
+
+
+def build() -> None:
+    asyncio.run(abuild())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build()
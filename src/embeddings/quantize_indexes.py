@@ -0,0 +1,36 @@
+# src/embeddings/quantize_indexes.py
+"""
+One-off: rewrite each built index in settings.INDEX_PATHS with int8 vectors
+(see common.quantize_index). Docstores are untouched; already-quantized and
+missing indexes are skipped.
+"""
+import logging
+import os
+
+import faiss
+from config.settings import INDEX_PATHS
+from src.embeddings.common import quantize_index
+from src.embeddings.vectorstore_io import INDEX_NAME
+
+log = logging.getLogger(__name__)
+
+QUANTIZED_TYPES = (faiss.IndexScalarQuantizer, faiss.IndexHNSWSQ)
+
+
+def quantize_indexes() -> None:
+    for dataset_key, folder in INDEX_PATHS.items():
+        path = os.path.join(folder, f"{INDEX_NAME}.faiss")
+        if not os.path.exists(path):
+            log.info("skip %s: no index at %s", dataset_key, path)
+            continue
+        index = faiss.read_index(path)
+        if isinstance(index, QUANTIZED_TYPES):
+            log.info("skip %s: already int8", dataset_key)
+            continue
+        faiss.write_index(quantize_index(index), path)
+        log.info("quantized %s (%d vectors) -> %s", dataset_key, index.ntotal, path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    quantize_indexes()
@@ -1,60 +1,88 @@
+import asyncio
 import pandas as pd
+import logging
 import os
 from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import OpenAIEmbeddings
+from typing import List
 from langchain.docstore.document import Document
+from src.embeddings.common import (
+    aembed_texts,
+    build_hnsw_vectorstore,
+    cached_embeddings,
+    dedupe_documents,
+    read_text_columns,
+)
+from src.embeddings.vectorstore_io import save_vectorstore
+from src.parquet_builders.raw_csv import ensure_raw_parquet
 from config import settings  # centralized config
 
 # === Load API Key ===
 load_dotenv()
+log = logging.getLogger(__name__)
 
 # === Config ===
-DATA_PATH = settings.DATASETS["team_capsheets"]
-VECTORSTORE_DIR = settings.INDEX_PATHS["team_capsheets"]
+DATA_PATH = settings.TEAM_CAPSHEETS_RAW_PARQUET
+VECTORSTORE_DIR = settings.TEAM_CAPSHEETS_INDEX
 MODEL_NAME = settings.EMBEDDING_MODEL
+SEASONS = ["2025-26", "2026-27", "2027-28", "2028-29", "2029-30", "2030-31"]
 
-# === Load Data ===
-df = pd.read_csv(DATA_PATH, skiprows=1)  # skip the extra header row (i.e., `,,Salary,Salary,...`)
-df = df.fillna("")  # fill blanks
 
-# === Build Documents ===
-documents = []
+def load_documents() -> List[Document]:
+    # === Load Data ===
+    # Read the Parquet snapshot of the raw CSV (rebuilt by src/parquet_builders/raw_csv.py when the CSV changes,
+    # which drops the extra `,,Salary,Salary,...` header row), loading only the columns used below,
+    # as Arrow strings with blanks as "".
+    ensure_raw_parquet("team_capsheets")
+    df = read_text_columns(DATA_PATH, ["Team", *SEASONS])
 
-for _, row in df.iterrows():
-    team = row["Team"]
+    # === Build Documents ===
+    # Whole-column string ops instead of iterrows(); same text as the original per-row template.
+    # One "YYYY-YY: amount" line per season with a commitment.
+    salary_lines = pd.Series("", index=df.index)
+    for season in SEASONS:
+        salary_lines += df[season].where(df[season] == "", season + ": " + df[season] + "\n")
+    salary_str = salary_lines.str.removesuffix("\n")
 
-    # Extract salaries by year
-    salary_by_year = {
-        "2025-26": row.get("2025-26", ""),
-        "2026-27": row.get("2026-27", ""),
-        "2027-28": row.get("2027-28", ""),
-        "2028-29": row.get("2028-29", ""),
-        "2029-30": row.get("2029-30", ""),
-        "2030-31": row.get("2030-31", ""),
-    }
+    contents = (
+        "Team: " + df["Team"]
+        + "\n    Future Salary Commitments:"
+        + "\n    " + salary_str
+    ).str.strip().tolist()
+    metadatas = df[["Team"]].rename(columns={"Team": "team"}).to_dict("records")
+    documents = [Document(page_content=c, metadata=m) for c, m in zip(contents, metadatas)]
+    # Identical rows would only add duplicate vectors; embed each distinct document once.
+    return dedupe_documents(documents)
 
-    # Format salary info
-    salary_str = "\n".join([f"{year}: {salary}" for year, salary in salary_by_year.items() if salary])
 
-    content = f"""
-    Team: {team}
-    Future Salary Commitments:
-    {salary_str}
-    """.strip()
+async def abuild() -> None:
+    documents = load_documents()
 
-    metadata = {
-        "team": team,
-    }
+    # === Create Vector Store ===
+    # Large request batches, sent concurrently, instead of afrom_documents' small default chunks.
+    # Vectors are cached on disk by content hash, so rebuilds only embed rows that changed;
+    # the precomputed vectors are then indexed in an HNSW graph.
+    embedding_model = OpenAIEmbeddings(
+        model=MODEL_NAME,
+        api_key=os.getenv("OPEN_AI_KEY"),
+        chunk_size=2048,
+        max_retries=6,
+    )
+    texts = [doc.page_content for doc in documents]
+    metadatas = [doc.metadata for doc in documents]
+    vectors = await aembed_texts(cached_embeddings(embedding_model, namespace=MODEL_NAME), texts)
+    vectorstore = build_hnsw_vectorstore(embedding_model, texts, vectors, metadatas)
 
-    documents.append(Document(page_content=content, metadata=metadata))
+    # === Save to Disk ===
+    save_vectorstore(vectorstore, VECTORSTORE_DIR)
 
-# === Create Vector Store ===
-embedding_model = OpenAIEmbeddings(model=MODEL_NAME, api_key=os.getenv("OPEN_AI_KEY"))
-vectorstore = FAISS.from_documents(documents, embedding_model)
+    log.info("Team cap sheet index built and saved to %s", VECTORSTORE_DIR)
 
-# === Save to Disk ===
-os.makedirs(VECTORSTORE_DIR, exist_ok=True)
-vectorstore.save_local(VECTORSTORE_DIR)
 
-print(f"Team cap sheet index built and saved to {VECTORSTORE_DIR}")
+def build() -> None:
+    asyncio.run(abuild())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build()
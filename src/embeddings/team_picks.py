@@ -1,53 +1,85 @@
+import asyncio
 import pandas as pd
+import logging
 import os
+from typing import List
 from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import OpenAIEmbeddings
 from langchain.docstore.document import Document
+from src.embeddings.common import (
+    aembed_texts,
+    build_hnsw_vectorstore,
+    cached_embeddings,
+    dedupe_documents,
+)
+from src.embeddings.vectorstore_io import save_vectorstore
+from src.parquet_builders.raw_csv import ensure_raw_parquet
 from config import settings  # centralized config
 
 # === Load API Key ===
 load_dotenv()
+log = logging.getLogger(__name__)
 
 # === Config ===
-DATA_PATH = settings.DATASETS["team_picks"]
-VECTORSTORE_DIR = settings.INDEX_PATHS["team_picks"]
+DATA_PATH = settings.TEAM_PICKS_RAW_PARQUET
+VECTORSTORE_DIR = settings.TEAM_PICKS_INDEX
 MODEL_NAME = settings.EMBEDDING_MODEL
 
-# === Load Data ===
-df = pd.read_csv(DATA_PATH)
-df = df.fillna("")
 
-# === Build Documents ===
-documents = []
+def load_documents() -> List[Document]:
+    # === Load Data ===
+    # Read the Parquet snapshot of the raw CSV (rebuilt by src/parquet_builders/raw_csv.py when the CSV changes).
+    ensure_raw_parquet("team_picks")
+    df = pd.read_parquet(
+        DATA_PATH,
+        columns=["team", "year", "round", "details"],
+        dtype_backend="pyarrow",
+    ).fillna("")
 
-for _, row in df.iterrows():
-    team = row["team"]
-    year = row["year"]
-    round_type = row["round"]
-    details = row["details"]
+    # === Build Documents ===
+    # Build every page_content string with vectorized column ops instead of iterrows().
+    contents = (
+        "Team: " + df["team"]
+        + "\n    Year: " + df["year"].astype(str)
+        + "\n    Round: " + df["round"]
+        + "\n    Draft Pick Details: " + df["details"]
+    ).str.strip().tolist()
 
-    content = f"""
-    Team: {team}
-    Year: {year}
-    Round: {round_type}
-    Draft Pick Details: {details}
-    """.strip()
+    documents = [
+        Document(page_content=content, metadata={"team": team, "year": year, "round": round_type})
+        for content, team, year, round_type in zip(contents, df["team"], df["year"].tolist(), df["round"])
+    ]
+    # Identical rows would only add duplicate vectors; embed each distinct document once.
+    return dedupe_documents(documents)
 
-    metadata = {
-        "team": team,
-        "year": year,
-        "round": round_type,
-    }
 
-    documents.append(Document(page_content=content, metadata=metadata))
+async def abuild() -> None:
+    documents = load_documents()
 
-# === Create Vector Store ===
-embedding_model = OpenAIEmbeddings(model=MODEL_NAME, api_key=os.getenv("OPEN_AI_KEY"))
-vectorstore = FAISS.from_documents(documents, embedding_model)
+    # === Create Vector Store ===
+    # Embed all texts up front with concurrent batched requests (cached on disk by content hash),
+    # then index the precomputed vectors in an HNSW graph.
+    embedding_model = OpenAIEmbeddings(
+        model=MODEL_NAME,
+        api_key=os.getenv("OPEN_AI_KEY"),
+        chunk_size=2048,
+        max_retries=6,
+    )
+    texts = [doc.page_content for doc in documents]
+    metadatas = [doc.metadata for doc in documents]
+    vectors = await aembed_texts(cached_embeddings(embedding_model, namespace=MODEL_NAME), texts)
+    vectorstore = build_hnsw_vectorstore(embedding_model, texts, vectors, metadatas)
 
-# === Save to Disk ===
-os.makedirs(VECTORSTORE_DIR, exist_ok=True)
-vectorstore.save_local(VECTORSTORE_DIR)
+    # === Save to Disk ===
+    save_vectorstore(vectorstore, VECTORSTORE_DIR)
 
-print(f"Team picks index built and saved to {VECTORSTORE_DIR}")
+    log.info("Team picks index built and saved to %s", VECTORSTORE_DIR)
+
+
+def build() -> None:
+    asyncio.run(abuild())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build()
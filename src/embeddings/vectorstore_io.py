@@ -0,0 +1,101 @@
+# src/embeddings/vectorstore_io.py
+"""
+Save/load helpers for the FAISS vectorstores, shared by the build scripts and the retriever tools.
+
+Layout of an index folder:
+  index.faiss     FAISS index (memory-mapped on load)
+  index.pkl.zst   zstd-compressed (docstore, index_to_docstore_id) pickle
+  index.pkl       uncompressed pickle (older indexes; still loaded if no .zst exists)
+
+get_vectorstore(dataset_key) loads a dataset's index on first use and reuses it afterwards;
+all loaded indexes share one query embeddings client (query_embeddings()).
+"""
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional
+
+import faiss
+import zstandard as zstd
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+from config import settings
+
+INDEX_NAME = "index"
+ZSTD_LEVEL = 3
+
+# dataset key -> loaded vectorstore (process-wide)
+_VECTORSTORES: Dict[str, FAISS] = {}
+_QUERY_EMBEDDINGS: Optional[Embeddings] = None
+
+
+def save_vectorstore(vectorstore: FAISS, folder: str) -> None:
+    """
+    save_local, then replace the docstore pickle with a zstd-compressed copy.
+    """
+    path = Path(folder)
+    path.mkdir(parents=True, exist_ok=True)
+    vectorstore.save_local(str(path), index_name=INDEX_NAME)
+
+    pkl_path = path / f"{INDEX_NAME}.pkl"
+    compressed = zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(pkl_path.read_bytes())
+    (path / f"{INDEX_NAME}.pkl.zst").write_bytes(compressed)
+    pkl_path.unlink()
+
+
+def load_vectorstore(folder: str, embeddings: Embeddings) -> FAISS:
+    """
+    Load an index folder written by save_vectorstore (or plain save_local).
+    The FAISS index is memory-mapped read-only, so its vectors are paged in on demand and
+    the pages are shared (via the OS page cache) by every process serving the same index.
+    Only load folders this project built: the docstore is a pickle.
+    """
+    path = Path(folder)
+    index = faiss.read_index(str(path / f"{INDEX_NAME}.faiss"), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+
+    zst_path = path / f"{INDEX_NAME}.pkl.zst"
+    if zst_path.exists():
+        raw = zstd.ZstdDecompressor().decompress(zst_path.read_bytes())
+    else:
+        raw = (path / f"{INDEX_NAME}.pkl").read_bytes()
+    docstore, index_to_docstore_id = pickle.loads(raw)
+
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id,
+    )
+
+
+def query_embeddings() -> Embeddings:
+    """
+    Process-wide OpenAIEmbeddings client used to embed queries against the loaded indexes
+    (one client, so its HTTP connection pool is shared by every retriever tool).
+    .env and langchain_openai are loaded here, on first use, not when this module is imported.
+    """
+    global _QUERY_EMBEDDINGS
+    if _QUERY_EMBEDDINGS is None:
+        from dotenv import load_dotenv
+        from langchain_openai import OpenAIEmbeddings
+
+        load_dotenv()
+        _QUERY_EMBEDDINGS = OpenAIEmbeddings(
+            model=settings.EMBEDDING_MODEL,
+            api_key=os.getenv("OPEN_AI_KEY"),
+        )
+    return _QUERY_EMBEDDINGS
+
+
+def get_vectorstore(dataset_key: str) -> FAISS:
+    """
+    Vectorstore for settings.INDEX_PATHS[dataset_key], loaded from disk on first call and cached.
+    HNSW indexes get the configured query-time efSearch.
+    """
+    vectorstore = _VECTORSTORES.get(dataset_key)
+    if vectorstore is None:
+        vectorstore = load_vectorstore(settings.INDEX_PATHS[dataset_key], query_embeddings())
+        if hasattr(vectorstore.index, "hnsw"):
+            vectorstore.index.hnsw.efSearch = settings.HNSW_EF_SEARCH
+        _VECTORSTORES[dataset_key] = vectorstore
+    return vectorstore
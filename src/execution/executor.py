@@ -1,8 +1,12 @@
 # src/execution/executor.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List
 from langchain.tools import BaseTool
 from src.tools.tool_registry import ALL_TOOLS
 
+log = logging.getLogger(__name__)
+
 # Map legacy/simple retriever tool names (router output) -> structured aggregate tool names
 ALIAS_MAP: Dict[str, str] = {
     "player_stats_tool": "player_stats_aggregate",
@@ -12,6 +16,9 @@ ALIAS_MAP: Dict[str, str] = {
     # add more if needed
 }
 
+# Upper bound on tool calls run at once by execute_ops
+MAX_PARALLEL_OPS = 8
+
 STRUCTURED_HINT_KEYS = {"metric", "metrics", "agg", "group_by", "filters", "players", "teams", "k"}
 
 def build_tool_index(tools: List[BaseTool]) -> Dict[str, BaseTool]:
@@ -42,31 +49,46 @@ def _resolve_tool_and_args(step: Dict[str, Any], name_to_tool: Dict[str, BaseToo
             args = "; ".join(summary_parts)  # simple fallback string
     return tool, args, resolved_name
 
-def execute_ops(ops: Dict[str, Any], tools: List[BaseTool]) -> List[Dict[str, Any]]:
-    name_to_tool = build_tool_index(tools)
-    results: List[Dict[str, Any]] = []
-
-    for step in ops.get("ops", []):
-        if step.get("op") != "tool_call":
-            results.append({"error": f"Unsupported op type '{step.get('op')}'"})
-            continue
-
-        tool, call_args, resolved_name = _resolve_tool_and_args(step, name_to_tool)
-
-        if tool is None:
-            results.append({"error": f"Unknown tool '{step.get('tool_name')}'"})
-            continue
+def _invoke(tool: BaseTool, call_args: Any, resolved_name: str) -> Dict[str, Any]:
+    # Compute tools memoize their output (warehouse.cached_tool_output); look there before
+    # tool.invoke, so a repeated call skips the args_schema validation as well as the query
+    peek = getattr(getattr(tool, "func", None), "peek", None)
+    if peek is not None and isinstance(call_args, dict):
+        hit = peek(call_args)
+        if hit is not None:
+            return {"tool": resolved_name, "output": hit}
+    try:
+        # Structured aggregate tools accept dict directly
+        log.debug("%s args: %s", resolved_name, call_args)
+        out = tool.invoke(call_args)
+    except Exception as e:
+        return {"tool": resolved_name, "output": {"error": f"{type(e).__name__}: {e}"}}
+    return {"tool": resolved_name, "output": out}
+
+def execute_op(step: Dict[str, Any], name_to_tool: Dict[str, BaseTool]) -> Dict[str, Any]:
+    """
+    Run one routed op -> {"tool", "output"} (tool errors land in output) or {"error"}.
+    """
+    if step.get("op") != "tool_call":
+        return {"error": f"Unsupported op type '{step.get('op')}'"}
 
-        try:
-            # Structured aggregate tools accept dict directly
-            print(call_args)
-            out = tool.invoke(call_args)
-        except Exception as e:
-            out = {"error": f"{type(e).__name__}: {e}"}
+    tool, call_args, resolved_name = _resolve_tool_and_args(step, name_to_tool)
 
-        results.append({"tool": resolved_name, "output": out})
+    if tool is None:
+        return {"error": f"Unknown tool '{step.get('tool_name')}'"}
+    return _invoke(tool, call_args, resolved_name)
 
-    return results
+def execute_ops(ops: Dict[str, Any], tools: List[BaseTool]) -> List[Dict[str, Any]]:
+    """
+    Run the routed tool calls; independent ops run concurrently in a thread pool
+    (DuckDB releases the GIL while it scans parquet). Results keep the order of the ops.
+    """
+    name_to_tool = build_tool_index(tools)
+    steps = list(ops.get("ops", []))
+    if len(steps) <= 1:
+        return [execute_op(step, name_to_tool) for step in steps]
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_OPS, len(steps))) as pool:
+        return list(pool.map(lambda step: execute_op(step, name_to_tool), steps))
 
 if __name__ == "__main__":
     """
@@ -1,14 +1,17 @@
 # src/graphs/main_graph.py
 from __future__ import annotations
-from typing import TypedDict, Dict, Any, List
+import operator
+from typing import Annotated, TypedDict, Dict, Any, List
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 
 from src.agents.orchestrator_agent import OrchestratorAgent
 from src.agents.planner_agent import PlannerAgent
 from src.agents.router_agent import RouterAgent
 from src.agents.synthesis_agent import OutputSynthesisAgent
 from src.agents.retrieval_agent import RetrievalAgent   # FIX: correct import (was agents.retrieval_agent)
-from src.execution.executor import execute_ops
+from src.execution.executor import build_tool_index, execute_op
 from src.tools.tool_registry import ALL_TOOLS
 
 # ---------- State ----------
@@ -18,60 +21,85 @@ class PipelineState(TypedDict, total=False):
     plan: Dict[str, Any]
     ops: Dict[str, Any]
     results: List[Dict[str, Any]]
+    # one {"index", "result"} per op_runner branch, concatenated as the branches finish
+    op_results: Annotated[List[Dict[str, Any]], operator.add]
     answer_markdown: str
     error: str
 
 # ---------- Agents ----------
+# Repeated questions/plans are answered by the agents' own DecisionCaches (orchestrator,
+# planner, router), so the nodes carry no cache policy of their own
 orch = OrchestratorAgent()
 planner = PlannerAgent()
 router = RouterAgent()
 synth = OutputSynthesisAgent()
+retriever = RetrievalAgent()
+name_to_tool = build_tool_index(ALL_TOOLS)
 
 # ---------- Nodes ----------
+def _stream_answer(chunks) -> str:
+    # Forward synthesis chunks to stream_mode="custom" consumers as they arrive; return the full answer
+    writer = get_stream_writer()
+    parts = []
+    for text in chunks:
+        parts.append(text)
+        writer({"answer_token": text})
+    return "".join(parts).strip()
+
+# Nodes return only the keys they update (op_results is merged by its reducer, not overwritten)
 def n_orchestrator(state: PipelineState) -> PipelineState:
     dec = orch.invoke(state["question"])
-    return {**state, "route": dec["route"]}
+    return {"route": dec["route"]}
 
 def n_planner(state: PipelineState) -> PipelineState:
     plan = planner.invoke(state["question"])
-    return {**state, "plan": plan}
+    return {"plan": plan}
 
 def n_router(state: PipelineState) -> PipelineState:
     ops = router.invoke(state["plan"])
-    return {**state, "ops": ops}
+    return {"ops": ops}
 
-def n_executor(state: PipelineState) -> PipelineState:
+def n_op_runner(task: Dict[str, Any]) -> PipelineState:
+    # One routed op; every op of a plan runs as its own branch in the same step
     try:
-        results = execute_ops(state["ops"], ALL_TOOLS)
-        return {**state, "results": results}
+        result = execute_op(task["op"], name_to_tool)
     except Exception as e:
-        return {**state, "error": f"executor_error: {e}", "results": []}
+        result = {"error": f"executor_error: {e}"}
+    return {"op_results": [{"index": task["index"], "result": result}]}
 
 def n_synth_analyze(state: PipelineState) -> PipelineState:
-    answer = synth.invoke(
+    # Runs once all op_runner branches have finished; restore the routed op order
+    results = [r["result"] for r in sorted(state.get("op_results", []), key=lambda r: r["index"])]
+    answer = _stream_answer(synth.stream(
         state["question"],
-        results=state.get("results", []),
+        results=results,
         plan=state.get("plan"),
-    )
-    return {**state, "answer_markdown": answer}
+    ))
+    return {"results": results, "answer_markdown": answer}
 
 def n_retriever(state: PipelineState) -> PipelineState:
-    retriever = RetrievalAgent()
     try:
         raw = retriever.invoke(state["question"])
-        answer = synth.invoke(
+        answer = _stream_answer(synth.stream(
             state["question"],
             results=[{"tool": "retriever", "output": raw}],
             plan=None,
-        )
-        return {**state, "answer_markdown": answer}
+        ))
+        return {"answer_markdown": answer}
     except Exception as e:
-        return {**state, "error": f"retrieval_error: {e}", "answer_markdown": f"Retrieval failed: {e}"}
+        return {"error": f"retrieval_error: {e}", "answer_markdown": f"Retrieval failed: {e}"}
 
 # ---------- Routing ----------
 def branch(state: PipelineState) -> str:
     return "retrieve" if state.get("route") == "retrieve" else "analyze"
 
+def fan_out_ops(state: PipelineState):
+    # Fan out: one op_runner branch per routed op, run concurrently; synth_analyze joins them
+    ops = (state.get("ops") or {}).get("ops", [])
+    if not ops:
+        return "synth_analyze"
+    return [Send("op_runner", {"index": i, "op": op}) for i, op in enumerate(ops)]
+
 # ---------- Graph Builder ----------
 def build_main_graph():
     g = StateGraph(PipelineState)
@@ -80,7 +108,7 @@ def build_main_graph():
     g.add_node("orchestrator", n_orchestrator)
     g.add_node("planner", n_planner)
     g.add_node("router", n_router)
-    g.add_node("executor", n_executor)
+    g.add_node("op_runner", n_op_runner)
     g.add_node("synth_analyze", n_synth_analyze)
     g.add_node("retriever", n_retriever)
 
@@ -94,8 +122,8 @@ def build_main_graph():
     )
 
     g.add_edge("planner", "router")
-    g.add_edge("router", "executor")
-    g.add_edge("executor", "synth_analyze")
+    g.add_conditional_edges("router", fan_out_ops, ["op_runner", "synth_analyze"])
+    g.add_edge("op_runner", "synth_analyze")
     g.add_edge("retriever", END)
     g.add_edge("synth_analyze", END)
 
@@ -110,12 +138,20 @@ if __name__ == "__main__":
             q = input("\n🧭 Question (or 'quit'): ").strip()
             if q.lower() in {"quit", "exit"}:
                 break
-            state = graph.invoke({"question": q})
-            print(f"\nRoute: {state.get('route')}")
+            # Print the answer as it is synthesized; "values" carries the full state after each step
+            print("\n=== Final Answer ===\n")
+            state, streamed = {}, False
+            for mode, chunk in graph.stream({"question": q}, stream_mode=["custom", "values"]):
+                if mode == "custom" and "answer_token" in chunk:
+                    print(chunk["answer_token"], end="", flush=True)
+                    streamed = True
+                elif mode == "values":
+                    state = chunk
+            if not streamed:
+                print(state.get("answer_markdown") or "No answer.", end="")
+            print(f"\n\nRoute: {state.get('route')}")
             if state.get("error"):
                 print(f"\nError: {state['error']}")
-            print("\n=== Final Answer ===\n")
-            print(state.get("answer_markdown") or "No answer.")
             # Debug keys
             print("\n[debug keys]", list(state.keys()))
         except KeyboardInterrupt:
@@ -0,0 +1,38 @@
+# src/parquet_builders/build_all.py
+import argparse
+from src.parquet_builders.connection import close_con, export_parquet, get_con
+from src.parquet_builders.player_contracts import build_player_contracts_parquet
+from src.parquet_builders.player_stats import build_player_stats_parquet
+from src.parquet_builders.team_capsheets import build_team_capsheets_parquet
+from src.parquet_builders.team_picks import build_team_picks_parquet
+from src.parquet_builders.team_stats import build_team_stats_parquet
+
+def build_all(season: str) -> None:
+    """
+    Rebuild all five warehouse tables on one connection, in a single transaction: the
+    warehouse is updated all-or-nothing. The Parquet exports are written only after the
+    commit, so a failed rebuild leaves both the tables and the exports untouched.
+    """
+    con = get_con()
+    con.execute("BEGIN TRANSACTION")
+    try:
+        out_paths = {
+            "player_contracts": build_player_contracts_parquet(con=con, export=False),
+            "player_stats": build_player_stats_parquet(season, con=con, export=False),
+            "team_capsheets": build_team_capsheets_parquet(con=con, export=False),
+            "team_picks": build_team_picks_parquet(con=con, export=False),
+            "team_stats": build_team_stats_parquet(season, con=con, export=False),
+        }
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
+    for table, out_path in out_paths.items():
+        export_parquet(con, table, out_path)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--season", required=True, help="Season label like 2024-25")
+    args = ap.parse_args()
+    build_all(args.season)
+    close_con()
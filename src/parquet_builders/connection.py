@@ -0,0 +1,33 @@
+# src/parquet_builders/connection.py
+"""
+Writable connection to the DuckDB warehouse shared by the builders, so a full rebuild
+opens the database (and warms DuckDB) once instead of once per table.
+"""
+from pathlib import Path
+import duckdb
+from config.settings import WAREHOUSE_DB
+
+# Parquet exports: zstd (DuckDB's default level 3), row groups of 122,880 rows (DuckDB's own row-group size)
+PARQUET_WRITE_OPTIONS = {"compression": "zstd", "row_group_size": 122_880}
+
+_con: duckdb.DuckDBPyConnection | None = None
+
+def get_con() -> duckdb.DuckDBPyConnection:
+    """Process-wide read-write connection to settings.WAREHOUSE_DB (opened on first use)."""
+    global _con
+    if _con is None:
+        Path(WAREHOUSE_DB).parent.mkdir(parents=True, exist_ok=True)
+        _con = duckdb.connect(WAREHOUSE_DB)
+    return _con
+
+def close_con() -> None:
+    """Close the shared connection (checkpointing the warehouse) so readers can open it."""
+    global _con
+    if _con is not None:
+        _con.close()
+        _con = None
+
+def export_parquet(con: duckdb.DuckDBPyConnection, table: str, out_path: Path) -> None:
+    """Write warehouse `table` to `out_path` with PARQUET_WRITE_OPTIONS."""
+    con.table(table).write_parquet(out_path.as_posix(), **PARQUET_WRITE_OPTIONS)
+    print(f"wrote {out_path}")
@@ -0,0 +1,14 @@
+# src/parquet_builders/csv_reader.py
+from typing import Mapping
+
+def read_csv_sql(columns: Mapping[str, str], skip: int = 0) -> str:
+    """
+    DuckDB `read_csv(?, ...)` table function for a CSV with a known header and column types;
+    the file path is bound as a statement parameter.
+    Explicit columns skip the type sniffer and let DuckDB's parallel reader split the file.
+    """
+    cols = ", ".join(f"'{name}': '{dtype}'" for name, dtype in columns.items())
+    return (
+        f"read_csv(?, header=true, skip={int(skip)}, "
+        f"auto_detect=false, parallel=true, columns={{{cols}}})"
+    )
@@ -1,40 +1,59 @@
 # src/parquet_builders/player_contracts.py
 from pathlib import Path
 import duckdb
-from config.settings import DATASETS, PARQUET_FOLDERS
+from src.parquet_builders.connection import close_con, export_parquet, get_con
+from src.parquet_builders.csv_reader import read_csv_sql
+from config.settings import PLAYER_CONTRACTS_CSV, PARQUET_FOLDERS, WAREHOUSE_DB
 
-def build_player_contracts_parquet() -> Path:
-    src_csv = Path(DATASETS["player_contracts"])
+# Header and column types of the raw CSV (what read_csv_auto inferred), so the sniffer is skipped
+CSV_COLUMNS = {
+    "id": "BIGINT",
+    "name": "VARCHAR",
+    "team": "VARCHAR",
+    "Salary": "VARCHAR",
+    "Salary.1": "VARCHAR",
+    "Salary.2": "VARCHAR",
+    "Salary.3": "VARCHAR",
+    "Salary.4": "VARCHAR",
+    "Salary.5": "VARCHAR",
+    "Unnamed: 9": "VARCHAR",
+    "-additional": "VARCHAR",
+    "Note": "VARCHAR",
+}
+
+def build_player_contracts_parquet(con: duckdb.DuckDBPyConnection | None = None, export: bool = True) -> Path:
+    src_csv = Path(PLAYER_CONTRACTS_CSV)
     out_dir = Path(PARQUET_FOLDERS["player_contracts"])
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "player_contracts.parquet"
 
-    con = duckdb.connect()  # in-memory for the transform → parquet write
+    con = con if con is not None else get_con()  # persistent warehouse; the Parquet file is exported from the table
     # Strip $ and commas; tolerate blanks with TRY_CAST → NULLs
     con.execute(f"""
-    COPY (
+    CREATE OR REPLACE TABLE player_contracts AS (
       SELECT
         CAST(id AS INT)                                                               AS id,
         name                                                                          AS name,
         team                                                                          AS team,
 
-        TRY_CAST(REGEXP_REPLACE(Salary,     '[\\$,]', '') AS BIGINT)                  AS salary_2025_26,
-        TRY_CAST(REGEXP_REPLACE("Salary.1", '[\\$,]', '') AS BIGINT)                  AS salary_2026_27,
-        TRY_CAST(REGEXP_REPLACE("Salary.2", '[\\$,]', '') AS BIGINT)                  AS salary_2027_28,
-        TRY_CAST(REGEXP_REPLACE("Salary.3", '[\\$,]', '') AS BIGINT)                  AS salary_2028_29,
-        TRY_CAST(REGEXP_REPLACE("Salary.4", '[\\$,]', '') AS BIGINT)                  AS salary_2029_30,
-        TRY_CAST(REGEXP_REPLACE("Salary.5", '[\\$,]', '') AS BIGINT)                  AS salary_2030_31,
+        TRY_CAST(REPLACE(REPLACE(Salary, '$', ''), ',', '') AS BIGINT)                AS salary_2025_26,
+        TRY_CAST(REPLACE(REPLACE("Salary.1", '$', ''), ',', '') AS BIGINT)            AS salary_2026_27,
+        TRY_CAST(REPLACE(REPLACE("Salary.2", '$', ''), ',', '') AS BIGINT)            AS salary_2027_28,
+        TRY_CAST(REPLACE(REPLACE("Salary.3", '$', ''), ',', '') AS BIGINT)            AS salary_2028_29,
+        TRY_CAST(REPLACE(REPLACE("Salary.4", '$', ''), ',', '') AS BIGINT)            AS salary_2029_30,
+        TRY_CAST(REPLACE(REPLACE("Salary.5", '$', ''), ',', '') AS BIGINT)            AS salary_2030_31,
 
-        TRY_CAST(REGEXP_REPLACE("Unnamed: 9",'[\\$,]', '') AS BIGINT)                 AS total_guaranteed,
+        TRY_CAST(REPLACE(REPLACE("Unnamed: 9", '$', ''), ',', '') AS BIGINT)          AS total_guaranteed,
         "-additional"                                                                 AS player_id,
         Note                                                                          AS note
-      FROM read_csv_auto('{src_csv.as_posix()}', header=true)
+      FROM {read_csv_sql(CSV_COLUMNS)}
     )
-    TO '{out_path.as_posix()}' (FORMAT PARQUET);
-    """)
-    con.close()
-    print(f"wrote {out_path}")
+    """, [src_csv.as_posix()])
+    print(f"wrote {WAREHOUSE_DB}:player_contracts")
+    if export:  # build_all passes False and exports after its transaction commits
+        export_parquet(con, "player_contracts", out_path)
     return out_path
 
 if __name__ == "__main__":
     build_player_contracts_parquet()
+    close_con()
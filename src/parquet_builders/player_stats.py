@@ -2,27 +2,65 @@
 import argparse
 from pathlib import Path
 import duckdb
-from config.settings import DATASETS, PARQUET_FOLDERS
+from src.parquet_builders.connection import close_con, export_parquet, get_con
+from src.parquet_builders.csv_reader import read_csv_sql
+from config.settings import PLAYER_STATS_CSV, PARQUET_FOLDERS, WAREHOUSE_DB
 
-def build_player_stats_parquet(season: str) -> Path:
+# Header and column types of the raw CSV (what read_csv_auto inferred), so the sniffer is skipped
+CSV_COLUMNS = {
+    "Rk": "BIGINT",
+    "Player": "VARCHAR",
+    "Age": "DOUBLE",
+    "G": "BIGINT",
+    "GS": "BIGINT",
+    "MP": "BIGINT",
+    "FG": "BIGINT",
+    "FGA": "BIGINT",
+    "FG%": "DOUBLE",
+    "3P": "BIGINT",
+    "3PA": "BIGINT",
+    "3P%": "DOUBLE",
+    "2P": "BIGINT",
+    "2PA": "BIGINT",
+    "2P%": "DOUBLE",
+    "eFG%": "DOUBLE",
+    "FT": "BIGINT",
+    "FTA": "BIGINT",
+    "FT%": "DOUBLE",
+    "ORB": "BIGINT",
+    "DRB": "BIGINT",
+    "TRB": "BIGINT",
+    "AST": "BIGINT",
+    "STL": "BIGINT",
+    "BLK": "BIGINT",
+    "TOV": "BIGINT",
+    "PF": "BIGINT",
+    "PTS": "BIGINT",
+    "Trp-Dbl": "BIGINT",
+    "Awards": "VARCHAR",
+    "Player-additional": "VARCHAR",
+    "Team": "VARCHAR",
+}
+
+def build_player_stats_parquet(season: str, con: duckdb.DuckDBPyConnection | None = None, export: bool = True) -> Path:
     """
     Read the raw 'all_player_stats_by_team.csv' and write a single Parquet file,
     adding a 'season' column. No custom formatters; DuckDB handles types.
     """
-    src_csv = Path(DATASETS["player_stats"])
+    src_csv = Path(PLAYER_STATS_CSV)
     out_dir = Path(PARQUET_FOLDERS["player_stats"])
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "player_stats.parquet"
 
-    con = duckdb.connect()  # in-memory
+    con = con if con is not None else get_con()  # persistent warehouse; the Parquet file is exported from the table
     con.execute(f"""
-    COPY (
+    CREATE OR REPLACE TABLE player_stats AS (
       SELECT
         CAST(Rk AS INT)                 AS rk,
         Player                           AS player,
         "Player-additional"              AS player_id,
         Team                             AS team,
-        '{season}'                       AS season,
+        ?                                AS season,
 
         TRY_CAST(Age AS DOUBLE)          AS age,
         TRY_CAST(G AS INT)               AS g,
@@ -59,12 +97,12 @@ def build_player_stats_parquet(season: str) -> Path:
         TRY_CAST("Trp-Dbl" AS INT)       AS trip_dbl,
 
         Awards                            AS awards
-      FROM read_csv_auto('{src_csv.as_posix()}', header=true)
+      FROM {read_csv_sql(CSV_COLUMNS)}
     )
-    TO '{out_path.as_posix()}' (FORMAT PARQUET);
-    """)
-    con.close()
-    print(f"wrote {out_path}")
+    """, [season, src_csv.as_posix()])
+    print(f"wrote {WAREHOUSE_DB}:player_stats")
+    if export:  # build_all passes False and exports after its transaction commits
+        export_parquet(con, "player_stats", out_path)
     return out_path
 
 if __name__ == "__main__":
@@ -72,3 +110,4 @@ if __name__ == "__main__":
     ap.add_argument("--season", required=True, help="Season label like 2024-25")
     args = ap.parse_args()
     build_player_stats_parquet(args.season)
+    close_con()
@@ -0,0 +1,50 @@
+# src/parquet_builders/raw_csv.py
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from config.settings import DATASETS, RAW_PARQUET_PATHS
+
+# Extra header rows above the real header (team_capsheets has a `,,Salary,Salary,...` row)
+SKIP_ROWS = {"team_capsheets": 1}
+
+def build_raw_parquet(key: str) -> Path:
+    """
+    Convert one raw CSV in DATASETS to an untransformed Parquet snapshot:
+      data/parquet/raw/<key>.parquet
+
+    Column names and values are kept as in the CSV; all-blank columns
+    are written as strings so they read back as "" after fillna.
+    """
+    src_csv = Path(DATASETS[key])
+    out_path = Path(RAW_PARQUET_PATHS[key])
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pacsv.read_csv(
+        src_csv,
+        read_options=pacsv.ReadOptions(use_threads=True, skip_rows=SKIP_ROWS.get(key, 0)),
+    )
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+    pq.write_table(table, out_path, compression="zstd")
+    print(f"wrote {out_path}")
+    return out_path
+
+def ensure_raw_parquet(key: str) -> Path:
+    """
+    Path of the raw Parquet snapshot for `key`, (re)built first when it is missing
+    or older than its CSV, so readers never see data from before a CSV edit.
+    """
+    src_csv = Path(DATASETS[key])
+    out_path = Path(RAW_PARQUET_PATHS[key])
+    if not out_path.exists() or src_csv.stat().st_mtime > out_path.stat().st_mtime:
+        return build_raw_parquet(key)
+    return out_path
+
+def build_all_raw_parquet() -> None:
+    for key in DATASETS:
+        build_raw_parquet(key)
+
+if __name__ == "__main__":
+    build_all_raw_parquet()
@@ -1,9 +1,23 @@
 # src/parquet_builders/team_capsheets.py
 from pathlib import Path
 import duckdb
-from config.settings import DATASETS, PARQUET_FOLDERS
+from src.parquet_builders.connection import close_con, export_parquet, get_con
+from src.parquet_builders.csv_reader import read_csv_sql
+from config.settings import TEAM_CAPSHEETS_CSV, PARQUET_FOLDERS, WAREHOUSE_DB
 
-def build_team_capsheets_parquet() -> Path:
+# Header and column types of the raw CSV (what read_csv_auto inferred), so the sniffer is skipped
+CSV_COLUMNS = {
+    "Rk": "BIGINT",
+    "Team": "VARCHAR",
+    "2025-26": "VARCHAR",
+    "2026-27": "VARCHAR",
+    "2027-28": "VARCHAR",
+    "2028-29": "VARCHAR",
+    "2029-30": "VARCHAR",
+    "2030-31": "VARCHAR",
+}
+
+def build_team_capsheets_parquet(con: duckdb.DuckDBPyConnection | None = None, export: bool = True) -> Path:
     """
     Read raw team_capsheets.csv and write a single Parquet:
     data/parquet/team_capsheets/team_capsheets.parquet
@@ -13,36 +27,33 @@ def build_team_capsheets_parquet() -> Path:
     - Strips $ and commas; blanks -> NULL via TRY_CAST
     - Renames season columns to cap_YYYY_YY (no hyphens)
     """
-    src_csv = Path(DATASETS["team_capsheets"])
+    src_csv = Path(TEAM_CAPSHEETS_CSV)
     out_dir = Path(PARQUET_FOLDERS["team_capsheets"])
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "team_capsheets.parquet"
 
-    con = duckdb.connect()  # in-memory for transform -> parquet
+    con = con if con is not None else get_con()  # persistent warehouse; the Parquet file is exported from the table
     con.execute(f"""
-    COPY (
+    CREATE OR REPLACE TABLE team_capsheets AS (
       SELECT
         TRY_CAST(Rk AS INT)                                                         AS rk,
         Team                                                                        AS team,
 
-        TRY_CAST(REGEXP_REPLACE("2025-26",'[\\$,]', '') AS BIGINT)                  AS cap_2025_26,
-        TRY_CAST(REGEXP_REPLACE("2026-27",'[\\$,]', '') AS BIGINT)                  AS cap_2026_27,
-        TRY_CAST(REGEXP_REPLACE("2027-28",'[\\$,]', '') AS BIGINT)                  AS cap_2027_28,
-        TRY_CAST(REGEXP_REPLACE("2028-29",'[\\$,]', '') AS BIGINT)                  AS cap_2028_29,
-        TRY_CAST(REGEXP_REPLACE("2029-30",'[\\$,]', '') AS BIGINT)                  AS cap_2029_30,
-        TRY_CAST(REGEXP_REPLACE("2030-31",'[\\$,]', '') AS BIGINT)                  AS cap_2030_31
+        TRY_CAST(REPLACE(REPLACE("2025-26", '$', ''), ',', '') AS BIGINT)           AS cap_2025_26,
+        TRY_CAST(REPLACE(REPLACE("2026-27", '$', ''), ',', '') AS BIGINT)           AS cap_2026_27,
+        TRY_CAST(REPLACE(REPLACE("2027-28", '$', ''), ',', '') AS BIGINT)           AS cap_2027_28,
+        TRY_CAST(REPLACE(REPLACE("2028-29", '$', ''), ',', '') AS BIGINT)           AS cap_2028_29,
+        TRY_CAST(REPLACE(REPLACE("2029-30", '$', ''), ',', '') AS BIGINT)           AS cap_2029_30,
+        TRY_CAST(REPLACE(REPLACE("2030-31", '$', ''), ',', '') AS BIGINT)           AS cap_2030_31
 
-      FROM read_csv_auto(
-        '{src_csv.as_posix()}',
-        header=true,
-        skip=1              -- <-- skip the bogus first header row
-      )
+      FROM {read_csv_sql(CSV_COLUMNS, skip=1)}  -- skip the bogus first header row
     )
-    TO '{out_path.as_posix()}' (FORMAT PARQUET);
-    """)
-    con.close()
-    print(f"wrote {out_path}")
+    """, [src_csv.as_posix()])
+    print(f"wrote {WAREHOUSE_DB}:team_capsheets")
+    if export:  # build_all passes False and exports after its transaction commits
+        export_parquet(con, "team_capsheets", out_path)
     return out_path
 
 if __name__ == "__main__":
     build_team_capsheets_parquet()
+    close_con()
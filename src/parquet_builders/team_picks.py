@@ -1,39 +1,52 @@
 # src/parquet_builders/team_picks.py
 from pathlib import Path
 import duckdb
-from config.settings import DATASETS, PARQUET_FOLDERS
+from src.parquet_builders.connection import close_con, export_parquet, get_con
+from src.parquet_builders.csv_reader import read_csv_sql
+from config.settings import TEAM_PICKS_CSV, PARQUET_FOLDERS, WAREHOUSE_DB
 
-def build_team_picks_parquet() -> Path:
+# Header and column types of the raw CSV (what read_csv_auto inferred), so the sniffer is skipped
+CSV_COLUMNS = {
+    "team": "VARCHAR",
+    "year": "BIGINT",
+    "round": "VARCHAR",
+    "details": "VARCHAR",
+}
+
+def build_team_picks_parquet(con: duckdb.DuckDBPyConnection | None = None, export: bool = True) -> Path:
     """
     Read team_picks.csv and write a single Parquet:
       data/parquet/team_picks/team_picks.parquet
 
     Keeps data simple:
-      - team (TEXT)
+      - team (TEXT)         # "<Team> Future NBA Draft Picks", as in the CSV
+      - team_short (TEXT)   # team without that suffix; what the picks tool filters on
       - pick_year (INT)
       - pick_round (TEXT)   # "First" / "Second"
       - details (TEXT)
     """
-    src_csv = Path(DATASETS["team_picks"])
+    src_csv = Path(TEAM_PICKS_CSV)
     out_dir = Path(PARQUET_FOLDERS["team_picks"])
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "team_picks.parquet"
 
-    con = duckdb.connect()  # in-memory for transform → parquet write
+    con = con if con is not None else get_con()  # persistent warehouse; the Parquet file is exported from the table
     con.execute(f"""
-    COPY (
+    CREATE OR REPLACE TABLE team_picks AS (
       SELECT
         TRIM(team)                                  AS team,
+        regexp_replace(TRIM(team), ' *Future NBA Draft Picks$', '') AS team_short,
         TRY_CAST(year AS INT)                       AS pick_year,
         TRIM("round")                               AS pick_round,
         details                                     AS details
-      FROM read_csv_auto('{src_csv.as_posix()}', header=true)
+      FROM {read_csv_sql(CSV_COLUMNS)}
     )
-    TO '{out_path.as_posix()}' (FORMAT PARQUET);
-    """)
-    con.close()
-    print(f"wrote {out_path}")
+    """, [src_csv.as_posix()])
+    print(f"wrote {WAREHOUSE_DB}:team_picks")
+    if export:  # build_all passes False and exports after its transaction commits
+        export_parquet(con, "team_picks", out_path)
     return out_path
 
 if __name__ == "__main__":
     build_team_picks_parquet()
+    close_con()
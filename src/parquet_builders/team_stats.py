@@ -2,68 +2,79 @@
 import argparse
 from pathlib import Path
 import duckdb
-from config.settings import DATASETS, PARQUET_FOLDERS
+from src.parquet_builders.connection import close_con, export_parquet, get_con
+from src.parquet_builders.csv_reader import read_csv_sql
+from config.settings import TEAM_STATS_CSV, PARQUET_FOLDERS, WAREHOUSE_DB
 
-def build_team_stats_parquet(season: str) -> Path:
+# Header and column types of the raw CSV (what read_csv_auto inferred), so the sniffer is skipped
+CSV_COLUMNS = {
+    "Rk": "BIGINT",
+    "Team": "VARCHAR",
+    "G": "BIGINT",
+    "MP": "BIGINT",
+    "FG": "BIGINT",
+    "FGA": "BIGINT",
+    "FG%": "DOUBLE",
+    "3P": "BIGINT",
+    "3PA": "BIGINT",
+    "3P%": "DOUBLE",
+    "2P": "BIGINT",
+    "2PA": "BIGINT",
+    "2P%": "DOUBLE",
+    "FT": "BIGINT",
+    "FTA": "BIGINT",
+    "FT%": "DOUBLE",
+    "ORB": "BIGINT",
+    "DRB": "BIGINT",
+    "TRB": "BIGINT",
+    "AST": "BIGINT",
+    "STL": "BIGINT",
+    "BLK": "BIGINT",
+    "TOV": "BIGINT",
+    "PF": "BIGINT",
+    "PTS": "BIGINT",
+}
+
+def build_team_stats_parquet(season: str, con: duckdb.DuckDBPyConnection | None = None, export: bool = True) -> Path:
     """
     Convert total_team_stats.csv -> data/parquet/team_stats/team_stats.parquet
     - Adds a 'season' column
     - Removes trailing '*' from Team names
-    - Fixes leading-dot percentages ('.491' -> '0.491')
+    - Parses leading-dot percentages ('.491' -> 0.491)
     - Keeps everything else simple and typed
     """
-    src_csv = Path(DATASETS["team_stats"])
+    src_csv = Path(TEAM_STATS_CSV)
     out_dir = Path(PARQUET_FOLDERS["team_stats"])
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "team_stats.parquet"
 
-    con = duckdb.connect()  # in-memory
+    con = con if con is not None else get_con()  # persistent warehouse; the Parquet file is exported from the table
     con.execute(f"""
-    COPY (
+    CREATE OR REPLACE TABLE team_stats AS (
       SELECT
         TRY_CAST(Rk AS INT)                                                    AS rk,
         REGEXP_REPLACE(Team, '\\\\*$', '')                                     AS team,
-        '{season}'                                                             AS season,
+        ?                                                                      AS season,
 
         TRY_CAST(G   AS INT)                                                   AS g,
         TRY_CAST(MP  AS INT)                                                   AS mp,
         TRY_CAST(FG  AS INT)                                                   AS fg,
         TRY_CAST(FGA AS INT)                                                   AS fga,
 
-        -- percentages like .491 → 0.491
-        TRY_CAST(
-            CASE WHEN LEFT(CAST("FG%" AS VARCHAR),1)='.'
-                 THEN '0'||CAST("FG%" AS VARCHAR)
-                 ELSE CAST("FG%" AS VARCHAR)
-            END AS DOUBLE
-        ) AS fg_pct,
+        -- percentages like .491 parse directly as 0.491
+        TRY_CAST("FG%" AS DOUBLE)                                              AS fg_pct,
 
         TRY_CAST("3P"  AS INT)                                                 AS three_p,
         TRY_CAST("3PA" AS INT)                                                 AS three_pa,
-        TRY_CAST(
-            CASE WHEN LEFT(CAST("3P%" AS VARCHAR),1)='.'
-                 THEN '0'||CAST("3P%" AS VARCHAR)
-                 ELSE CAST("3P%" AS VARCHAR)
-            END AS DOUBLE
-        ) AS three_pct,
+        TRY_CAST("3P%" AS DOUBLE)                                              AS three_pct,
 
         TRY_CAST("2P"  AS INT)                                                 AS two_p,
         TRY_CAST("2PA" AS INT)                                                 AS two_pa,
-        TRY_CAST(
-            CASE WHEN LEFT(CAST("2P%" AS VARCHAR),1)='.'
-                 THEN '0'||CAST("2P%" AS VARCHAR)
-                 ELSE CAST("2P%" AS VARCHAR)
-            END AS DOUBLE
-        ) AS two_pct,
+        TRY_CAST("2P%" AS DOUBLE)                                              AS two_pct,
 
         TRY_CAST(FT  AS INT)                                                   AS ft,
         TRY_CAST(FTA AS INT)                                                   AS fta,
-        TRY_CAST(
-            CASE WHEN LEFT(CAST("FT%" AS VARCHAR),1)='.'
-                 THEN '0'||CAST("FT%" AS VARCHAR)
-                 ELSE CAST("FT%" AS VARCHAR)
-            END AS DOUBLE
-        ) AS ft_pct,
+        TRY_CAST("FT%" AS DOUBLE)                                              AS ft_pct,
 
         TRY_CAST(ORB AS INT)                                                   AS orb,
         TRY_CAST(DRB AS INT)                                                   AS drb,
@@ -74,12 +85,12 @@ def build_team_stats_parquet(season: str) -> Path:
         TRY_CAST(TOV AS INT)                                                   AS tov,
         TRY_CAST(PF  AS INT)                                                   AS pf,
         TRY_CAST(PTS AS INT)                                                   AS pts
-      FROM read_csv_auto('{src_csv.as_posix()}', header=true)
+      FROM {read_csv_sql(CSV_COLUMNS)}
     )
-    TO '{out_path.as_posix()}' (FORMAT PARQUET);
-    """)
-    con.close()
-    print(f"wrote {out_path}")
+    """, [season, src_csv.as_posix()])
+    print(f"wrote {WAREHOUSE_DB}:team_stats")
+    if export:  # build_all passes False and exports after its transaction commits
+        export_parquet(con, "team_stats", out_path)
     return out_path
 
 if __name__ == "__main__":
@@ -87,3 +98,4 @@ if __name__ == "__main__":
     ap.add_argument("--season", required=True, help="Season label like 2024-25")
     args = ap.parse_args()
     build_team_stats_parquet(args.season)
+    close_con()
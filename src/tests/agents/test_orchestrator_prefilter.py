@@ -0,0 +1,62 @@
+import pytest
+
+from src.agents.orchestrator_agent import OrchestratorAgent, _named_entity_count
+
+
+@pytest.fixture(scope="module")
+def agent():
+    # The LLM client is built but never called by _prefilter; no real key is needed
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("OPENAI_API_KEY", "sk-test")
+        yield OrchestratorAgent()
+
+
+@pytest.mark.parametrize("question", [
+    "Top 5 teams by assists",
+    "Who is the best rebounder this season?",
+    "Who is the leading scorer for the Celtics?",
+    "Compare average points for Celtics and Knicks",
+    "How many players averaged 20 points?",
+    "Show me every draft pick the Thunder own",
+])
+def test_analyze_keywords(agent, question):
+    decision = agent._prefilter(question)
+    assert decision is not None
+    assert decision.route == "analyze"
+    assert not decision.used_llm
+
+
+@pytest.mark.parametrize("question", [
+    "Who is LeBron James?",
+    "What is the contract of Jalen Brunson?",
+    "Jalen Brunson's contract details",
+    "The Lakers cap hit",
+])
+def test_single_entity_lookups_retrieve(agent, question):
+    decision = agent._prefilter(question)
+    assert decision is not None
+    assert decision.route == "retrieve"
+
+
+@pytest.mark.parametrize("question", [
+    "Which team does Curry play for?",
+    "What's the contract for the NBA's MVP?",
+    "List all players with salaries over $40M",
+    "Which players have big contracts?",
+    "What is the contract of Jalen Brunson and Josh Hart?",
+    "contracts over 40M",
+    "Tell me about the draft",
+])
+def test_ambiguous_questions_go_to_llm(agent, question):
+    assert agent._prefilter(question) is None
+
+
+@pytest.mark.parametrize("question, count", [
+    ("Who is LeBron James?", 1),
+    ("Who's Curry's salary", 1),
+    ("Does Jalen Brunson have a contract?", 1),
+    ("What does the NBA salary cap look like", 0),
+    ("Boston Celtics vs New York Knicks", 2),
+])
+def test_named_entity_count(question, count):
+    assert _named_entity_count(question) == count
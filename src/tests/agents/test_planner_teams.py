@@ -0,0 +1,21 @@
+import pytest
+
+from src.agents.planner_agent import _resolve_teams
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Lakers", "Los Angeles Lakers"),
+    ("Sixers", "Philadelphia 76ers"),
+    ("76ers", "Philadelphia 76ers"),
+    ("Clippers", "Los Angeles Clippers"),
+    ("Blazers", "Portland Trail Blazers"),
+    ("Trail Blazers", "Portland Trail Blazers"),
+    ("GSW", "Golden State Warriors"),
+    ("golden state warriors", "Golden State Warriors"),
+])
+def test_resolve_team_names(name, expected):
+    assert _resolve_teams([name]) == [expected]
+
+
+def test_resolve_teams_dedupes_aliases():
+    assert _resolve_teams(["Lakers", "LAL", "Los Angeles Lakers"]) == ["Los Angeles Lakers"]
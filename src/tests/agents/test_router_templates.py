@@ -0,0 +1,65 @@
+import pytest
+
+from src.agents.router_agent import _template_args
+
+
+def _plan(dataset, metric=None, players=(), teams=(), season="2024-25", goal="lookup"):
+    return {
+        "goal": goal,
+        "dataset": dataset,
+        "timeframe": {"season": season},
+        "entities": {"players": list(players), "teams": list(teams)},
+        "metric_hint": metric,
+        "notes": [],
+    }
+
+
+def test_contract_lookup():
+    args = _template_args(_plan("player_contracts", "salary", players=["Jalen Brunson"], season="2026-27"))
+    assert args == {"season": "2026-27", "players": ["Jalen Brunson"], "metric": "salary", "agg": "max", "group_by": "player"}
+
+
+@pytest.mark.parametrize("metric, agg", [
+    ("pts", "sum"),
+    ("trb", "sum"),
+    ("g", "sum"),
+    ("fg_pct", "avg"),
+    ("three_pct", "avg"),
+    ("age", "avg"),
+])
+def test_player_stats_sums_counts_and_averages_rates(metric, agg):
+    args = _template_args(_plan("player_stats", metric, players=["Stephen Curry"]))
+    assert args == {"season": "2024-25", "players": ["Stephen Curry"], "metric": metric, "agg": agg, "group_by": "player"}
+
+
+@pytest.mark.parametrize("metric", ["awards", "player", "team", "season", "player_id", "not_a_column", None])
+def test_player_stats_non_numeric_metrics_go_to_llm(metric):
+    assert _template_args(_plan("player_stats", metric, players=["Stephen Curry"])) is None
+
+
+def test_team_stats_lookup():
+    args = _template_args(_plan("team_stats", "three_pct", teams=["Boston Celtics"]))
+    assert args == {"season": "2024-25", "teams": ["Boston Celtics"], "metric": "three_pct", "agg": "avg", "group_by": "team"}
+
+
+@pytest.mark.parametrize("metric", ["team", "season", "not_a_column", None])
+def test_team_stats_non_numeric_metrics_go_to_llm(metric):
+    assert _template_args(_plan("team_stats", metric, teams=["Boston Celtics"])) is None
+
+
+@pytest.mark.parametrize("metric, expected", [(None, "cap"), ("cap", "cap"), ("salary", "salary"), ("cap_space", "cap_space")])
+def test_capsheets_lookup(metric, expected):
+    args = _template_args(_plan("team_capsheets", metric, teams=["Phoenix Suns"], season="2025-26"))
+    assert args == {"season": "2025-26", "teams": ["Phoenix Suns"], "metric": expected, "group_by": "team"}
+
+
+@pytest.mark.parametrize("plan", [
+    _plan("player_stats", "pts", players=["Stephen Curry"], goal="top scorers compared to Curry"),
+    _plan("team_stats", "pts", teams=["Boston Celtics"], goal="league average points"),
+    _plan("player_stats", "pts", players=["Stephen Curry"], season=None),
+    _plan("player_stats", "pts", players=["Stephen Curry"], teams=["Golden State Warriors"]),
+    _plan("player_contracts", "salary", teams=["Boston Celtics"]),
+    _plan("team_picks", None, teams=["Oklahoma City Thunder"]),
+])
+def test_aggregate_or_mixed_plans_go_to_llm(plan):
+    assert _template_args(plan) is None
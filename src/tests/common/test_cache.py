@@ -0,0 +1,53 @@
+import threading
+
+from src.common.cache import DecisionCache, normalize_question, payload_key
+
+
+def test_normalize_question_collapses_case_and_whitespace():
+    assert normalize_question("  Who IS\tLeBron   James? ") == "who is lebron james?"
+
+
+def test_payload_key_ignores_dict_key_order():
+    assert payload_key({"a": 1, "b": [2]}) == payload_key({"b": [2], "a": 1})
+    assert payload_key({"a": 1}) != payload_key({"a": 2})
+
+
+def test_exact_hit_matches_normalized_question():
+    cache = DecisionCache()
+    cache.put("Top 5 teams by assists", {"route": "analyze"})
+    assert cache.get("  top 5 TEAMS by assists ") == {"route": "analyze"}
+    assert cache.get("Top 6 teams by assists") is None
+
+
+def test_hits_are_fresh_copies():
+    cache = DecisionCache()
+    cache.put("q", {"ops": [1]})
+    cache.get("q")["ops"].append(2)
+    assert cache.get("q") == {"ops": [1]}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = DecisionCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # a is now most recent
+    cache.put("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_concurrent_gets_and_puts_with_eviction():
+    cache = DecisionCache(maxsize=8)
+
+    def work(n):
+        for i in range(500):
+            cache.put(f"q{(n + i) % 32}", i)
+            cache.get(f"q{(n * 7 + i) % 32}")
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(cache._exact) == 8
@@ -1,30 +1,30 @@
 import os
 from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
 from config import settings  # centralized config
+from src.embeddings.vectorstore_io import load_vectorstore
+from src.tools.base.base_retriever_tool import search_documents
 
-# Load your API key
-load_dotenv()
-embedding_model = OpenAIEmbeddings(model=settings.EMBEDDING_MODEL, api_key=os.getenv("OPEN_AI_KEY"))
 
-# Load FAISS index
-vectorstore = FAISS.load_local(
-    settings.INDEX_PATHS["player_contracts"], 
-    embedding_model,
-    allow_dangerous_deserialization=True
-)
+def main():
+    # Load your API key (at run time, not on import)
+    load_dotenv()
+    embedding_model = OpenAIEmbeddings(model=settings.EMBEDDING_MODEL, api_key=os.getenv("OPEN_AI_KEY"))
 
-# Set up retriever
-retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 1})
+    # Load FAISS index
+    vectorstore = load_vectorstore(settings.PLAYER_CONTRACTS_INDEX, embedding_model)
 
-# Sample user query
-query = "What is siakam's contract?"
+    # Sample user query
+    query = "What is siakam's contract?"
 
-# Run retrieval
-docs = retriever.get_relevant_documents(query)
+    # Run retrieval (top-1, straight on the FAISS index)
+    docs = search_documents(vectorstore, [embedding_model.embed_query(query)], k=1)[0]
 
-# Display results
-for i, doc in enumerate(docs):
-    print(f"\n--- Document {i+1} ---")
-    print(doc.page_content)
+    # Display results
+    for i, doc in enumerate(docs):
+        print(f"\n--- Document {i+1} ---")
+        print(doc.page_content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import pytest
+
+from src.tools.base.warehouse import FILTER_OPS, filter_column, parse_filter_key
+
+COLS = frozenset({"team", "pts", "g"})
+
+
+@pytest.mark.parametrize("key, expected", [
+    ("pts", ("pts", "=")),
+    ("pts__gte", ("pts", ">=")),
+    ("pts__lte", ("pts", "<=")),
+    ("pts__gt", ("pts", ">")),
+    ("pts__lt", ("pts", "<")),
+    ("pts__eq", ("pts", "=")),
+    ("pts__ne", ("pts", "!=")),
+])
+def test_parse_filter_key(key, expected):
+    assert parse_filter_key(key) == expected
+
+
+@pytest.mark.parametrize("key", ["pts__like", "pts__", "pts__gte;DROP TABLE team_stats"])
+def test_unknown_op_is_ignored(key):
+    assert parse_filter_key(key) is None
+
+
+def test_filter_ops_are_read_only():
+    with pytest.raises(TypeError):
+        FILTER_OPS["like"] = "LIKE"
+
+
+def test_filter_column_accepts_known_columns():
+    assert filter_column("team_stats", "pts", COLS) == "pts"
+
+
+@pytest.mark.parametrize("col", ["PTS", "pts; DROP TABLE team_stats", "1=1 OR pts", ""])
+def test_filter_column_rejects_unknown_columns(col):
+    with pytest.raises(ValueError, match="Valid columns"):
+        filter_column("team_stats", col, COLS)
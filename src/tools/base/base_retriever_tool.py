@@ -1,28 +1,81 @@
 # scripts/tools/base/base_retriever_tool.py
+from typing import List, Optional
+
+import faiss
+import numpy as np
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-from config import settings
-import os
-from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.tools import Tool
+from src.common.cache import DecisionCache
+from src.embeddings.vectorstore_io import get_vectorstore
+
+# Searches are a handful of queries each and the tools already run on a thread pool,
+# so FAISS's own OpenMP threads would only add fork/join overhead
+faiss.omp_set_num_threads(1)
+
+
+def search_documents(vectorstore: FAISS, vectors, k: int) -> List[List[Document]]:
+    """
+    Top-k documents for each query vector: one index.search over a float32 batch,
+    docs looked up in the docstore directly (no retriever/Runnable wrapping).
+    """
+    _, ids = vectorstore.index.search(np.asarray(vectors, dtype=np.float32), k)
+    docstore = vectorstore.docstore
+    id_map = vectorstore.index_to_docstore_id
+    return [[docstore.search(id_map[i]) for i in row if i != -1] for row in ids]
 
-load_dotenv()
 
 class BaseRetrieverTool:
     def __init__(self, dataset_key: str, description: str, num_results: int = 1):
         self.dataset_key = dataset_key
         self.description = description
-        self.embedding_model = OpenAIEmbeddings(
-            model=settings.EMBEDDING_MODEL,
-            api_key=os.getenv("OPEN_AI_KEY")
-        )
-        self.vectorstore = FAISS.load_local(
-            settings.INDEX_PATHS[dataset_key],
-            self.embedding_model,
-            allow_dangerous_deserialization=True
-        )
-        self.retriever = self.vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": num_results})
+        self.num_results = num_results
+        # normalized query -> result text, exact match only: near-identical queries about a
+        # different player/team/season ("Stephen Curry" vs "Seth Curry") must not share documents
+        self.cache = DecisionCache(maxsize=1024)
+
+    @property
+    def vectorstore(self):
+        # Loaded on first run(), not when the tool is built
+        return get_vectorstore(self.dataset_key)
 
     def run(self, query: str) -> str:
-        docs = self.retriever.get_relevant_documents(query)
-        return "\n\n".join([doc.page_content for doc in docs])
+        hit = self.cache.get(query)
+        if hit is not None:
+            return hit
+
+        vector = self.vectorstore.embedding_function.embed_query(query)
+        docs = search_documents(self.vectorstore, [vector], self.num_results)[0]
+        result = "\n\n".join([doc.page_content for doc in docs])
+        self.cache.put(query, result)
+        return result
+
+    def batch_run(self, queries: List[str]) -> List[str]:
+        """
+        run() for several queries: cache misses are embedded in one embed_documents request
+        and searched as one FAISS batch. Results keep input order.
+        """
+        results: List[Optional[str]] = [None] * len(queries)
+        for i, query in enumerate(queries):
+            results[i] = self.cache.get(query)
+        misses = [i for i, hit in enumerate(results) if hit is None]
+        if not misses:
+            return results
+
+        vectorstore = self.vectorstore
+        vectors = vectorstore.embedding_function.embed_documents([queries[i] for i in misses])
+        hits = search_documents(vectorstore, vectors, self.num_results)
+        for i, docs in zip(misses, hits):
+            result = "\n\n".join([doc.page_content for doc in docs])
+            results[i] = result
+            self.cache.put(queries[i], result)
+        return results
+
 
+def make_retriever_tool(dataset_key: str, description: str, num_results: int = 1) -> Tool:
+    """
+    LangChain Tool "<dataset_key>_tool" over a BaseRetrieverTool. Building it is cheap:
+    the FAISS index is only loaded on the tool's first call.
+    """
+    tool = BaseRetrieverTool(dataset_key=dataset_key, description=description, num_results=num_results)
+    return Tool(name=f"{dataset_key}_tool", description=tool.description, func=tool.run)
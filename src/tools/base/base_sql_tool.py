@@ -1,16 +1,20 @@
 # src/tools/base/base_sql_tool.py  (or your path)
 from __future__ import annotations
-from typing import Any, Dict, Optional, Sequence, Tuple, Type
+import asyncio
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple, Type
 
 import duckdb
 from pydantic import BaseModel, PrivateAttr
 from langchain.tools import BaseTool
+from src.tools.base.warehouse import TABLES, acquire, parquet_path as table_parquet_path, statement
 
 class BaseSQLTool(BaseTool):
     """
     LangChain Tool base for deterministic SQL/Parquet compute via DuckDB.
     Subclasses must implement:
-      - build_sql_and_params(**kwargs) -> (sql: str, params: Sequence[Any])
+      - build_sql_and_params(**kwargs) -> (sql: str, params: Sequence[Any]), selecting FROM self.source
       - name: str
       - description: str
       - args_schema: type[pydantic.BaseModel]
@@ -24,26 +28,57 @@ class BaseSQLTool(BaseTool):
     args_schema: Type[BaseModel]  # set on subclass
 
     # Private attrs (not validated/serialized by pydantic)
-    _db: duckdb.DuckDBPyConnection = PrivateAttr()
+    # Own connection only for an explicit db_path; otherwise queries go through the shared
+    # warehouse (pooled cursors, cached statements) and its settings are left alone
+    _db: Optional[duckdb.DuckDBPyConnection] = PrivateAttr(default=None)
+    _source: str = PrivateAttr()
 
     def __init__(self, *, name: str, description: str, parquet_path: str, db_path: Optional[str] = None, **kwargs: Any):
         super().__init__(name=name, description=description, parquet_path=parquet_path, db_path=db_path, **kwargs)
-        self._db = duckdb.connect(db_path or ":memory:")
+        if db_path:
+            self._db = duckdb.connect(db_path)
+            self._db.execute("PRAGMA enable_object_cache")  # keep Parquet metadata between queries
+        self._source = self._resolve_source()
+
+    @property
+    def source(self) -> str:
+        """FROM target for parquet_path: its warehouse table if it has one, else a read_parquet scan."""
+        return self._source
+
+    def _resolve_source(self) -> str:
+        if self.db_path is None:
+            target = os.path.abspath(self.parquet_path)
+            for table in TABLES:
+                if os.path.abspath(table_parquet_path(table)) == target:
+                    return table
+        return "read_parquet('" + self.parquet_path.replace("'", "''") + "')"
 
     # Subclass hook
     def build_sql_and_params(self, **kwargs) -> Tuple[str, Sequence[Any]]:
         raise NotImplementedError
 
+    @contextmanager
+    def _cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        if self._db is None:
+            with acquire() as cur:
+                yield cur
+            return
+        cur = self._db.cursor()  # a cursor per call, so concurrent calls never share one
+        try:
+            yield cur
+        finally:
+            cur.close()
+
     # LangChain Tool API
     def _run(self, tool_input: Dict[str, Any], **_) -> Any:
         sql, params = self.build_sql_and_params(**tool_input)
-        res = self._db.execute(sql, params).fetchall()
-        desc = getattr(self._db, "description", None)
-        cols = [d[0] for d in desc] if desc else []
-        if len(cols) == 1:
-            return res[0][0] if res else None
-        return [dict(zip(cols, row)) for row in res]
+        with self._cursor() as cur:
+            tbl = cur.execute(sql if self._db is not None else statement(sql), params).fetch_arrow_table()
+        if tbl.num_columns == 1:
+            return tbl.column(0)[0].as_py() if tbl.num_rows else None
+        # Arrow -> row dicts in C instead of zipping every fetched tuple in Python
+        return tbl.to_pylist()
 
     async def _arun(self, tool_input: Dict[str, Any], **_) -> Any:
-        # DuckDB is sync; you can add a threadpool here later if needed
-        return self._run(tool_input)
+        # DuckDB is sync: run it in a worker thread so concurrent tool calls don't block the event loop
+        return await asyncio.to_thread(self._run, tool_input)
@@ -0,0 +1,257 @@
+# src/tools/base/warehouse.py
+"""
+Shared DuckDB connection for the compute tools.
+
+The cleaned tables (player_stats, team_stats, player_contracts, team_capsheets, team_picks)
+live in DuckDB native storage at settings.WAREHOUSE_DB, written by src/parquet_builders.
+If that file is missing (e.g. a fresh checkout that only has the Parquet exports),
+the same table names are served as views over data/parquet/<table>.parquet.
+"""
+import inspect
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from types import MappingProxyType
+from typing import AbstractSet, Any, Callable, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import duckdb
+import pyarrow as pa
+from config.settings import PARQUET_FOLDERS, WAREHOUSE_DB
+from src.common.cache import DecisionCache, payload_key
+
+TABLES = tuple(PARQUET_FOLDERS)
+THREADS = os.cpu_count() or 4  # DuckDB worker threads, shared by all queries on the connection
+POOL_SIZE = THREADS  # cursors available to concurrent tool calls
+MAX_ROWS = 1024  # rows rendered per tool result; anything beyond is cut off with a note
+FLOAT_DIGITS = 3  # decimals shown for float cells (averages, per-game rates)
+TOOL_CACHE_SIZE = 512  # memoized results per compute tool
+STATEMENT_CACHE_SIZE = 1024  # parsed SQL shapes kept (prewarmed shapes included)
+
+# Tool filters are {"col__op": value} or {"col": value}; op suffix -> SQL comparison
+FILTER_OPS = MappingProxyType({"gte": ">=", "lte": "<=", "gt": ">", "lt": "<", "eq": "=", "ne": "!="})
+
+_conn: duckdb.DuckDBPyConnection | None = None
+_conn_lock = threading.Lock()
+_pool: "queue.Queue[duckdb.DuckDBPyConnection] | None" = None
+_prewarm_sources: List[Callable[[], Iterable[str]]] = []  # parsed once the warehouse is first used
+
+log = logging.getLogger(__name__)
+
+
+def parquet_path(table: str) -> str:
+    return os.path.join(PARQUET_FOLDERS[table], f"{table}.parquet")
+
+
+def _connect() -> duckdb.DuckDBPyConnection:
+    if os.path.exists(WAREHOUSE_DB):
+        con = duckdb.connect(WAREHOUSE_DB, read_only=True)
+        con.execute(f"SET threads = {THREADS}")
+        return con
+    con = duckdb.connect(database=":memory:")
+    con.execute(f"SET threads = {THREADS}")
+    con.execute("PRAGMA enable_object_cache")  # the views re-read Parquet footers on every query otherwise
+    for table in TABLES:
+        con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{parquet_path(table)}')")
+    return con
+
+
+def warehouse() -> duckdb.DuckDBPyConnection:
+    """Process-wide read-only connection to the warehouse (opened on first use)."""
+    global _conn
+    if _conn is None:
+        with _conn_lock:
+            if _conn is None:
+                _conn = _connect()
+    return _conn
+
+
+def columns(table: str) -> List[str]:
+    """Column names of a warehouse table, from the catalog (DESCRIBE reads no data)."""
+    with acquire() as con:
+        return [row[0] for row in con.execute(f"DESCRIBE {table}").fetchall()]
+
+
+@lru_cache(maxsize=256)
+def parse_filter_key(key: str) -> Optional[Tuple[str, str]]:
+    """(column, SQL operator) for a filter key: 'col__gte' -> ('col', '>='), 'col' -> ('col', '=').
+    None for an unknown op suffix (the filter is ignored)."""
+    if "__" not in key:
+        return key, "="
+    col, suf = key.split("__", 1)
+    op = FILTER_OPS.get(suf)
+    return (col, op) if op else None
+
+
+@lru_cache(maxsize=None)
+def row_count(table: str) -> int:
+    """
+    Total rows in a warehouse table, counted once per process (the warehouse is read-only).
+    Unfiltered COUNT(*) tool calls bind this instead of running a query over the table.
+    """
+    with acquire() as con:
+        return con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def filter_column(table: str, col: str, known: AbstractSet[str]) -> str:
+    """
+    `col` if it is a column of `table`, else ValueError naming the valid columns. Filter keys
+    come from the LLM and are spliced into SQL, so they are checked before any query runs.
+    """
+    if col not in known:
+        raise ValueError(f"Unknown filter column '{col}' for {table}. Valid columns: {sorted(known)}")
+    return col
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def statement(sql: str) -> duckdb.Statement:
+    """
+    Parsed form of `sql`, cached by text. The compute tools build the same SQL for every call
+    with the same argument shape (values go through ? parameters), so each shape is parsed once.
+    """
+    return warehouse().extract_statements(sql)[0]
+
+
+def prewarm(*shape_sources: Callable[[], Iterable[str]]) -> threading.Thread:
+    """
+    Parse the SQL shapes yielded by each source into the statement() cache on a daemon thread,
+    so the first requests with those shapes skip parsing. Returns the (started) thread.
+    """
+    def _run() -> None:
+        try:
+            for source in shape_sources:
+                for sql in source():
+                    statement(sql)
+        except Exception:  # e.g. warehouse not built yet; requests will parse on demand
+            log.warning("statement prewarm stopped early", exc_info=True)
+
+    thread = threading.Thread(target=_run, name="warehouse-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def prewarm_on_first_use(*shape_sources: Callable[[], Iterable[str]]) -> None:
+    """
+    Register SQL shape sources for prewarm(), started when the first query borrows a cursor.
+    Importing a tool module therefore never opens (or locks) the warehouse file.
+    """
+    _prewarm_sources.extend(shape_sources)
+
+
+def _cursor_pool() -> "queue.Queue[duckdb.DuckDBPyConnection]":
+    global _pool
+    if _pool is None:
+        con = warehouse()  # takes _conn_lock itself
+        created = False
+        with _conn_lock:
+            if _pool is None:
+                pool = queue.Queue()
+                for _ in range(POOL_SIZE):
+                    pool.put(con.cursor())
+                _pool = pool
+                created = True
+        if created and _prewarm_sources:
+            prewarm(*_prewarm_sources)
+    return _pool
+
+
+@contextmanager
+def acquire() -> Iterator[duckdb.DuckDBPyConnection]:
+    """
+    Borrow a cursor on the warehouse for the duration of the block. Tools run concurrently
+    and a DuckDB connection must not run two queries at once; the pool is bounded, so
+    at most POOL_SIZE queries run at a time and later callers wait for a free cursor.
+    """
+    pool = _cursor_pool()
+    cur = pool.get()
+    try:
+        yield cur
+    finally:
+        pool.put(cur)
+
+
+def _cell_sql(field: pa.Field) -> str:
+    col = '"{}"'.format(field.name.replace('"', '""'))
+    if pa.types.is_floating(field.type):
+        col = f"round({col}, {FLOAT_DIGITS})"
+    return f"coalesce(CAST({col} AS VARCHAR), 'None')"
+
+
+def _markdown_lines(con: duckdb.DuckDBPyConnection, tbl: pa.Table) -> List[str]:
+    # One VARCHAR per row, formatted by DuckDB over the whole Arrow batch (NULL renders as None, like str())
+    cells = ", ".join(_cell_sql(field) for field in tbl.schema)
+    return [line for (line,) in con.from_arrow(tbl).project(f"'| ' || concat_ws(' | ', {cells}) || ' |'").fetchall()]
+
+
+@lru_cache(maxsize=64)
+def _md_header(headers: Tuple[str, ...]) -> str:
+    # Header + separator rows; tools return the same few column sets over and over
+    return "| " + " | ".join(headers) + " |\n| " + " | ".join(["---"] * len(headers)) + " |"
+
+
+def markdown_table(headers: Sequence[str], lines: Sequence[str]) -> str:
+    """Header and separator rows followed by already rendered '| a | b |' row lines."""
+    return "\n".join([_md_header(tuple(headers)), *lines])
+
+
+def query_markdown(sql: str, params: Sequence[Any], empty: str = "_No results._") -> str:
+    """
+    Run `sql` and render the result as a markdown table (header, separator, one line per row),
+    or `empty` when it returns no rows. Cells are cast to text in DuckDB, not per cell in Python;
+    floats are rounded to FLOAT_DIGITS decimals first.
+    At most MAX_ROWS rows are fetched and rendered; a longer result ends with a truncation note.
+    """
+    with acquire() as con:
+        # One batch of MAX_ROWS + 1: the extra row only tells us the result was longer
+        reader = con.execute(statement(sql), params).fetch_record_batch(MAX_ROWS + 1)
+        batch = next(iter(reader), None)
+        reader.close()
+        if batch is None or not batch.num_rows:
+            return empty
+        truncated = batch.num_rows > MAX_ROWS
+        tbl = pa.Table.from_batches([batch.slice(0, MAX_ROWS)])
+        lines = _markdown_lines(con, tbl)
+    table = markdown_table(tbl.column_names, lines)
+    # Blank line first, or markdown would read the note as another table row
+    return f"{table}\n\n_Truncated to the first {MAX_ROWS} rows._" if truncated else table
+
+
+def cached_tool_output(fn: Callable[..., str]) -> Callable[..., str]:
+    """
+    Memoize a compute tool's markdown output by its arguments (defaults applied, JSON with
+    sorted keys, so equal calls share an entry however they are spelled). The warehouse is
+    opened read-only and does not change while the process runs, so entries never go stale.
+    Errors are not cached.
+
+    wrapper.peek(args) returns the cached output for an args dict without running `fn`, so
+    the executor can answer a repeated call before StructuredTool validates its input.
+    """
+    sig = inspect.signature(fn)
+    cache = DecisionCache(maxsize=TOOL_CACHE_SIZE)
+
+    def _key(args: tuple, kwargs: dict) -> str:
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return payload_key(bound.arguments)
+
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> str:
+        key = _key(args, kwargs)
+        hit = cache.get(key)
+        if hit is None:
+            hit = fn(*args, **kwargs)
+            cache.put(key, hit)
+        return hit
+
+    def peek(call_args: Mapping[str, Any]) -> Optional[str]:
+        try:
+            key = _key((), dict(call_args))
+        except TypeError:  # args the function does not take: leave them to the args_schema
+            return None
+        return cache.get(key)
+
+    wrapper.peek = peek  # type: ignore[attr-defined]
+    wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+    return wrapper
@@ -1,32 +1,34 @@
 # src/tools/compute/player_contracts.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-import duckdb
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from pydantic import BaseModel, Field, field_validator
 from src.capabilities.team_abbrev import TEAM_NAME_TO_ABBR
 from langchain.tools import StructuredTool
+from src.tools.base.warehouse import (
+    cached_tool_output, columns, filter_column, parse_filter_key, query_markdown, row_count,
+)
 
-PARQUET_PATH = "data/parquet/player_contracts.parquet"
+TABLE = "player_contracts"  # warehouse table (see src/tools/base/warehouse.py)
 DEFAULT_SEASON = "2024-25"
 
-# cache DuckDB connection
-_con_cache: duckdb.DuckDBPyConnection | None = None
-def _con() -> duckdb.DuckDBPyConnection:
-    global _con_cache
-    if _con_cache is None:
-        _con_cache = duckdb.connect(database=":memory:")
-    return _con_cache
+@lru_cache(maxsize=256)
+def _team_abbrs(teams: Tuple[str, ...]) -> Tuple[str, ...]:
+    # Full team names -> abbreviations used in the contracts table (unknown names pass through)
+    return tuple(TEAM_NAME_TO_ABBR.get(t.lower(), t) for t in teams)
 
 class ContractsAggArgs(BaseModel):
     # NOTE: season is ONLY used to choose the correct salary_<YYYY_YY> column.
     season: Optional[str] = Field(default=None, description="Season label (e.g. 2026-27) used to pick salary_<YYYY_YY> column")
     players: Optional[List[str]] = Field(default=None, description="Filter to these player names")
     teams: Optional[List[str]] = Field(default=None, description="Filter to these teams (abbreviations in your parquet)")
-    metric: str = Field(default="salary", description="Either 'salary' or explicit salary_<YYYY_YY> or another numeric column")
+    metric: str = Field(default="salary", description="Either 'salary', explicit salary_<YYYY_YY>, 'salary_total' (sum of every salary year) or another numeric column")
     agg: str = Field(default="max", description="Aggregation: max|min|sum|avg|count")
     group_by: str = Field(default="none", description="none|player|team")
     k: Optional[int] = Field(default=None, description="Top-k after grouping")
     filters: Optional[Dict[str, Any]] = Field(default=None)
+    include_context: bool = Field(default=True, description="Also return name/team/note context columns")
 
     @field_validator("group_by", mode="before")
     @classmethod
@@ -55,41 +57,44 @@ class ContractsAggArgs(BaseModel):
     def _normalize_teams(cls, v):
         if not v:
             return v
-        out = []
-        for t in v:
-            key = t.lower()
-            out.append(TEAM_NAME_TO_ABBR.get(key, t))
-        return out
+        return list(_team_abbrs(tuple(v)))
 
 # ---- NEW helpers for dynamic metric resolution (season -> salary column) ----
-_SCHEMA_COLS: List[str] | None = None
-def _schema_cols() -> List[str]:
-    global _SCHEMA_COLS
+# Derived once from the schema: salary_<YYYY_YY> columns newest first, season label -> column,
+# and the row-wise sum of every salary year (metric='salary_total')
+_SCHEMA_COLS: FrozenSet[str] | None = None
+_SALARY_COLS_DESC: Tuple[str, ...] = ()
+_SALARY_COL_BY_SEASON: Dict[str, str] = {}
+_SALARY_TOTAL_EXPR = "0"
+def _schema_cols() -> FrozenSet[str]:
+    global _SCHEMA_COLS, _SALARY_COLS_DESC, _SALARY_COL_BY_SEASON, _SALARY_TOTAL_EXPR
     if _SCHEMA_COLS is None:
-        cur = _con().execute(f"SELECT * FROM read_parquet('{PARQUET_PATH}') LIMIT 1")
-        _SCHEMA_COLS = [d[0] for d in cur.description]
+        cols = columns(TABLE)
+        _SALARY_COLS_DESC = tuple(sorted((c for c in cols if c.startswith("salary_")), reverse=True))
+        # salary_2026_27 -> '2026-27'
+        _SALARY_COL_BY_SEASON = {c[len("salary_"):].replace("_", "-"): c for c in _SALARY_COLS_DESC}
+        if _SALARY_COLS_DESC:
+            _SALARY_TOTAL_EXPR = "(" + " + ".join(f"COALESCE({c}, 0)" for c in reversed(_SALARY_COLS_DESC)) + ")"
+        _SCHEMA_COLS = frozenset(cols)
     return _SCHEMA_COLS
 
-def _season_to_salary_col(season: str) -> str:
-    # '2026-27' -> salary_2026_27
-    return f"salary_{season.replace('-', '_')}"
-
 def _resolve_metric(a: ContractsAggArgs) -> str:
-    cols = _schema_cols()
-    # Explicit salary_<...>
-    if a.metric.startswith("salary_"):
-        return a.metric if a.metric in cols else a.metric  # will fail later if missing
+    _schema_cols()
+    # All remaining salary years summed per contract row, read in the same scan
+    if a.metric == "salary_total":
+        return _SALARY_TOTAL_EXPR
     # Generic 'salary' + season
     if a.metric == "salary" and a.season:
-        cand = _season_to_salary_col(a.season)
-        if cand in cols:
+        cand = _SALARY_COL_BY_SEASON.get(a.season)
+        if cand:
             return cand
     # Fallback: if generic 'salary' with no season, pick latest salary_ column lexicographically
-    if a.metric == "salary":
-        salary_cols = sorted([c for c in cols if c.startswith("salary_")], reverse=True)
-        if salary_cols:
-            return salary_cols[0]
-    return a.metric  # may or may not exist; DuckDB will error if invalid
+    if a.metric == "salary" and _SALARY_COLS_DESC:
+        return _SALARY_COLS_DESC[0]
+    # Any other metric is spliced into the SQL as a column name: it must be one
+    if a.metric not in _SCHEMA_COLS:
+        raise ValueError(f"Unknown metric '{a.metric}'. Use salary, salary_total or one of: {sorted(_SCHEMA_COLS)}")
+    return a.metric
 
 def _agg_expr(metric: str, agg: str) -> str:
     if agg == "count":
@@ -104,29 +109,24 @@ def _build_where(a: ContractsAggArgs) -> tuple[str, List[Any]]:
     clauses: List[str] = []
     params: List[Any] = []
 
+    # Lists bind as one LIST parameter, so the SQL text does not depend on how many names are given
     if a.players:
-        placeholders = ",".join(["?"] * len(a.players))
-        clauses.append(f"name IN ({placeholders})")
-        params.extend(a.players)
+        clauses.append("list_contains(?, name)")
+        params.append(list(a.players))
 
     if a.teams:
-        placeholders = ",".join(["?"] * len(a.teams))
-        clauses.append(f"team IN ({placeholders})")
-        params.extend(a.teams)
+        clauses.append("list_contains(?, team)")
+        params.append(list(a.teams))
 
-    op_map = {"gte": ">=", "lte": "<=", "gt": ">", "lt": "<", "eq": "=", "ne": "!="}
     if a.filters:
+        cols = _schema_cols()
         for key, val in a.filters.items():
-            if val is None:
+            parsed = parse_filter_key(key)
+            if val is None or parsed is None:
                 continue
-            if "__" in key:
-                col, suf = key.split("__", 1)
-                if suf in op_map:
-                    clauses.append(f"{col} {op_map[suf]} ?")
-                    params.append(val)
-            else:
-                clauses.append(f"{key} = ?")
-                params.append(val)
+            col, op = parsed
+            clauses.append(f"{filter_column(TABLE, col, cols)} {op} ?")
+            params.append(val)
 
     where_sql = " AND ".join(clauses) if clauses else "TRUE"
     return where_sql, params
@@ -144,61 +144,51 @@ def _build_sql(a: ContractsAggArgs) -> tuple[str, List[Any]]:
     # Map logical group_by keyword 'player' to physical column 'name'
     group_col_physical = "name" if a.group_by == "player" else a.group_by
 
-    # Always include note (and team/name where possible)
+    # Include note (and team/name where possible) unless the caller opted out of context columns
+    if a.group_by == "none" and a.agg == "count" and where_sql == "TRUE" and not a.include_context:
+        # Unfiltered count with nothing else to read: the cached table row count, no scan
+        return "SELECT ? AS value", [row_count(TABLE)]
+
     if a.group_by == "none":
         # Single aggregate row (may represent one or many players). We still surface a representative
         # name/team/note via first().
-        sql = f"""
-        SELECT
-            {agg_expr} AS value,
+        context = """,
             first(name)  AS name,
             first(team)  AS team,
-            first(note)  AS note
-        FROM read_parquet('{PARQUET_PATH}')
+            first(note)  AS note""" if a.include_context else ""
+        sql = f"""
+        SELECT
+            {agg_expr} AS value{context}
+        FROM {TABLE}
         WHERE {where_sql}
         """
         return sql, params
 
     # Grouped case: include group column + value + team (if grouping by player) + note
     select_extra = ""
-    if a.group_by == "player":  # grouping by logical player -> name
-        select_extra = ", first(team) AS team, first(note) AS note"
-    elif a.group_by == "team":
-        select_extra = ", first(note) AS note"
-    else:
-        # Unexpected group_by (should only be player|team); still attempt note
-        select_extra = ", first(note) AS note"
+    if a.include_context:
+        if a.group_by == "player":  # grouping by logical player -> name
+            select_extra = ", first(team) AS team, first(note) AS note"
+        else:
+            # team (or an unexpected group_by; should only be player|team): still attempt note
+            select_extra = ", first(note) AS note"
 
     sql = f"""
     SELECT
         {group_col_physical} AS {a.group_by},
         {agg_expr} AS value
         {select_extra}
-    FROM read_parquet('{PARQUET_PATH}')
+    FROM {TABLE}
     WHERE {where_sql}
     GROUP BY {group_col_physical}
     ORDER BY value DESC
     """
     if a.k:
-        sql += f" LIMIT {int(a.k)}"
+        sql += " LIMIT ?"  # bound, so the SQL text is the same for every k
+        params.append(int(a.k))
     return sql, params
 
-def _execute(sql: str, params: List[Any]) -> List[Dict[str, Any]]:
-    cur = _con().execute(sql, params)
-    cols = [d[0] for d in cur.description]
-    rows = cur.fetchall()
-    return [{cols[i]: row[i] for i in range(len(cols))} for row in rows]
-
-def _to_markdown(rows: List[Dict[str, Any]]) -> str:
-    if not rows:
-        return "_No contract results._"
-    headers = list(rows[0].keys())
-    lines = ["| " + " | ".join(headers) + " |",
-             "| " + " | ".join(["---"] * len(headers)) + " |"]
-    for r in rows:
-        lines.append("| " + " | ".join(str(r[h]) for h in headers) + " |")
-    return "\n".join(lines)
-
+@cached_tool_output
 def run_contracts_agg(
     season: Optional[str] = None,
     players: Optional[List[str]] = None,
@@ -208,6 +198,7 @@ def run_contracts_agg(
     group_by: str = "none",
     k: Optional[int] = None,
     filters: Optional[Dict[str, Any]] = None,
+    include_context: bool = True,
 ) -> str:
     args = ContractsAggArgs(
         season=season,
@@ -218,19 +209,25 @@ def run_contracts_agg(
         group_by=group_by,
         k=k,
         filters=filters,
+        include_context=include_context,
     )
     sql, params = _build_sql(args)
-    rows = _execute(sql, params)
     # Optional: if grouping by player and you really wanted raw contract lines, you'd switch tools.
-    return _to_markdown(rows)
+    return query_markdown(sql, params, empty="_No contract results._")
+
+async def run_contracts_agg_async(**kwargs: Any) -> str:
+    # DuckDB is sync: run in a worker thread so several tool calls can be awaited together
+    return await asyncio.to_thread(run_contracts_agg, **kwargs)
 
 contracts_aggregate_tool = StructuredTool.from_function(
     name="contracts_aggregate",
     description=(
         "Aggregate contract salary columns. Args: season (used to pick salary_<YYYY_YY>), players, teams, "
-        "metric('salary' or explicit column), agg(max|min|sum|avg|count), group_by(none|player|team), k, filters(col__gte style)."
+        "metric('salary', explicit column, or 'salary_total' for all years summed), agg(max|min|sum|avg|count), group_by(none|player|team), k, filters(col__gte style), "
+        "include_context (name/team/note columns)."
     ),
     func=run_contracts_agg,
+    coroutine=run_contracts_agg_async,
     args_schema=ContractsAggArgs,
 )
 
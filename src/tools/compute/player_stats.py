@@ -1,20 +1,16 @@
 # tools/compute/player_stats.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-import duckdb
+import asyncio
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional
 from pydantic import BaseModel, Field, field_validator
 from langchain.tools import StructuredTool
+from src.tools.base.warehouse import cached_tool_output, columns, filter_column, parse_filter_key, query_markdown
 
-PARQUET_PATH = "data/parquet/player_stats.parquet"
+TABLE = "player_stats"  # warehouse table (see src/tools/base/warehouse.py)
 DEFAULT_SEASON = "2024-25"
 
-# --- DuckDB connection cache ---
-_duck_con: duckdb.DuckDBPyConnection | None = None
-def _con() -> duckdb.DuckDBPyConnection:
-    global _duck_con
-    if _duck_con is None:
-        _duck_con = duckdb.connect(database=":memory:")
-    return _duck_con
+log = logging.getLogger(__name__)
 
 # --- Args schema for StructuredTool ---
 class PlayerStatsAggregateArgs(BaseModel):
@@ -27,6 +23,7 @@ class PlayerStatsAggregateArgs(BaseModel):
     teams: Optional[List[str]] = None
     filters: Optional[Dict[str, Any]] = Field(default=None)
     k: Optional[int] = Field(default=None)
+    include_context: bool = Field(default=True, description="Also return games_played (needed for per-game figures)")
 
     @field_validator("group_by", mode="before")
     @classmethod
@@ -44,23 +41,30 @@ def _coalesce_metrics(metric: Optional[str], metrics: Optional[List[str]]) -> Li
     # No metric(s) provided -> we will default to a synthetic count metric upstream
     return []
 
+_SCHEMA_COLS: FrozenSet[str] | None = None
+def _schema_cols() -> FrozenSet[str]:
+    global _SCHEMA_COLS
+    if _SCHEMA_COLS is None:
+        _SCHEMA_COLS = frozenset(columns(TABLE))
+    return _SCHEMA_COLS
+
 def _build_where(a: Dict[str, Any]) -> str:
     clauses: List[str] = []
     if a.get("season"):
         clauses.append("season = ?")
     if a.get("players"):
-        clauses.append("player IN (" + ",".join(["?"] * len(a["players"])) + ")")
+        clauses.append("list_contains(?, player)")  # whole list is one parameter
     if a.get("teams"):
-        clauses.append("team IN (" + ",".join(["?"] * len(a["teams"])) + ")")
+        clauses.append("list_contains(?, team)")
     filters = a.get("filters") or {}
-    op_map = {"gte": ">=", "lte": "<=", "gt": ">", "lt": "<", "eq": "="}
+    cols = _schema_cols()
     for k, v in filters.items():
-        if "__" in k:
-            col, suf = k.split("__", 1)
-            if suf in op_map:
-                clauses.append(f"{col} {op_map[suf]} ?")
-        else:
-            clauses.append(f"{k} = ?")
+        # Same skip rule as _build_params (None value or unknown op), so clauses and params line up
+        parsed = parse_filter_key(k)
+        if v is None or parsed is None:
+            continue
+        col, op = parsed
+        clauses.append(f"{filter_column(TABLE, col, cols)} {op} ?")
     return " AND ".join(clauses) if clauses else "TRUE"
 
 def _build_params(a: Dict[str, Any]) -> List[Any]:
@@ -68,19 +72,33 @@ def _build_params(a: Dict[str, Any]) -> List[Any]:
     if a.get("season"):
         params.append(a["season"])
     if a.get("players"):
-        params.extend(a["players"])
+        params.append(list(a["players"]))
     if a.get("teams"):
-        params.extend(a["teams"])
+        params.append(list(a["teams"]))
     filters = a.get("filters") or {}
     for k, v in filters.items():
-        if v is None:
+        if v is None or parse_filter_key(k) is None:
             continue
-        if "__" in k:
-            params.append(v)
-        else:
-            params.append(v)
+        params.append(v)
+    # Top-k is a bound LIMIT ? (grouped queries only), so the SQL text is the same for every k
+    if a.get("k") and a["group_by"] != "none":
+        params.append(int(a["k"]))
     return params
 
+_AGGS = {"avg", "sum", "min", "max", "count", "median"}
+
+def _check_names(a: Dict[str, Any]) -> None:
+    # metrics, group_by and agg are spliced into the SQL text: only schema columns / known aggregates pass
+    cols = _schema_cols()
+    bad = [m for m in a["metrics"] if m != "row_count" and m not in cols]
+    if bad:
+        raise ValueError(f"Unknown metrics {bad}. Valid columns: {sorted(cols)}")
+    if a["group_by"] != "none" and a["group_by"] not in cols:
+        raise ValueError(f"Unknown group_by '{a['group_by']}'. Use none or one of: {sorted(cols)}")
+    agg = a["agg"]
+    if agg not in _AGGS and not (agg[:1] == "p" and agg[1:].isdigit() and 0 < int(agg[1:]) < 100):
+        raise ValueError("agg must be avg|sum|min|max|count|median|pNN")
+
 def _agg_expr(col: str, agg: str) -> str:
     agg_l = agg.lower()
     if agg_l.startswith("p"):
@@ -100,79 +118,66 @@ def _build_sql(a: Dict[str, Any]) -> str:
     group_by = a["group_by"]
     agg = a["agg"]
     metrics = a["metrics"]
+    # Context column, only projected (and read) when asked for
+    gp = ", SUM(g) AS games_played" if a.get("include_context", True) else ""
 
     # Special default COUNT path (synthetic metric name)
     if len(metrics) == 1 and metrics[0] == "row_count" and agg == "count":
         if group_by == "none":
             return (
-                f"SELECT COUNT(*) AS row_count, SUM(g) AS games_played "
-                f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql}"
+                f"SELECT COUNT(*) AS row_count{gp} "
+                f"FROM {TABLE} WHERE {where_sql}"
             )
         else:
             sql = (
-                f"SELECT {group_by} AS {group_by}, COUNT(*) AS value, SUM(g) AS games_played "
-                f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql} GROUP BY {group_by}"
+                f"SELECT {group_by} AS {group_by}, COUNT(*) AS value{gp} "
+                f"FROM {TABLE} WHERE {where_sql} GROUP BY {group_by}"
             )
             if a.get("k"):
-                sql += f" ORDER BY value DESC LIMIT {int(a['k'])}"
+                sql += " ORDER BY value DESC LIMIT ?"
             return sql
 
-    # Multiple metrics + grouping -> UNION ALL
+    # Multiple metrics + grouping -> one grouped scan computing every metric, unpivoted to
+    # one (group_key, value, metric) row per group and metric
     if len(metrics) > 1 and group_by != "none":
-        subs = [
-            f"SELECT {group_by} AS group_key, {_agg_expr(m, agg)} AS value, "
-            f"'{m}' AS metric, SUM(g) AS games_played "
-            f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql} GROUP BY {group_by}"
-            for m in metrics
-        ]
-        sql = " UNION ALL ".join(subs)
+        aggs = ", ".join(f"{_agg_expr(m, agg)} AS {m}" for m in metrics)
+        sql = (
+            f"SELECT group_key, value, metric{', games_played' if gp else ''} FROM ("
+            f"SELECT {group_by} AS group_key, {aggs}{gp} "
+            f"FROM {TABLE} WHERE {where_sql} GROUP BY {group_by}"
+            f") UNPIVOT INCLUDE NULLS (value FOR metric IN ({', '.join(metrics)}))"
+        )
         if a.get("k"):
-            sql = f"SELECT * FROM ({sql}) ORDER BY value DESC LIMIT {int(a['k'])}"
+            sql = f"SELECT * FROM ({sql}) ORDER BY value DESC LIMIT ?"
         return sql
 
     # Multiple metrics, no grouping -> single row
     if len(metrics) > 1 and group_by == "none":
         select_parts = [f"{_agg_expr(m, agg)} AS {m}" for m in metrics]
-        select_parts.append("SUM(g) AS games_played")
         return (
-            f"SELECT {', '.join(select_parts)} "
-            f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql}"
+            f"SELECT {', '.join(select_parts)}{gp} "
+            f"FROM {TABLE} WHERE {where_sql}"
         )
 
     # Single metric path
     metric = metrics[0]
     if group_by == "none":
         return (
-            f"SELECT {_agg_expr(metric, agg)} AS {metric}, SUM(g) AS games_played "
-            f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql}"
+            f"SELECT {_agg_expr(metric, agg)} AS {metric}{gp} "
+            f"FROM {TABLE} WHERE {where_sql}"
         )
 
     # Single metric with grouping
     sql = (
-        f"SELECT {group_by} AS {group_by}, {_agg_expr(metric, agg)} AS value, "
-        f"SUM(g) AS games_played "
-        f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql} GROUP BY {group_by}"
+        f"SELECT {group_by} AS {group_by}, {_agg_expr(metric, agg)} AS value{gp} "
+        f"FROM {TABLE} WHERE {where_sql} GROUP BY {group_by}"
     )
     if a.get("k"):
-        sql += f" ORDER BY value DESC LIMIT {int(a['k'])}"
+        sql += " ORDER BY value DESC LIMIT ?"
     return sql
 
-def _execute(sql: str, params: List[Any]) -> List[Dict[str, Any]]:
-    cur = _con().execute(sql, params)
-    cols = [d[0] for d in cur.description]
-    return [{cols[i]: row[i] for i in range(len(cols))} for row in cur.fetchall()]
-
-def _to_markdown(rows: List[Dict[str, Any]]) -> str:
-    if not rows:
-        return "_No results._"
-    headers = list(rows[0].keys())
-    lines = ["| " + " | ".join(headers) + " |",
-             "| " + " | ".join(["---"] * len(headers)) + " |"]
-    for r in rows:
-        lines.append("| " + " | ".join(str(r[h]) for h in headers) + " |")
-    return "\n".join(lines)
-
 # --- Core callable with explicit kwargs (StructuredTool friendly) ---
+@cached_tool_output
 def run_player_stats_op(
     season: Optional[str] = None,
     metric: Optional[str] = None,
@@ -183,16 +188,19 @@ def run_player_stats_op(
     teams: Optional[List[str]] = None,
     filters: Optional[Dict[str, Any]] = None,
     k: Optional[int] = None,
+    include_context: bool = True,
 ) -> str:
     if isinstance(group_by, list):
         group_by = group_by[0] if group_by else "none"
+    group_by = group_by.lower()
+    agg = agg.lower()
 
     season = season or DEFAULT_SEASON
 
     # Default to COUNT(*) when no metric(s) provided
     if not metric and not metrics:
         agg = "count"
-    metrics_list = _coalesce_metrics(metric, metrics)
+    metrics_list = _coalesce_metrics(metric and metric.lower(), [m.lower() for m in metrics or []])
     if not metrics_list:
         metrics_list = ["row_count"]  # synthetic label for COUNT(*)
 
@@ -205,12 +213,17 @@ def run_player_stats_op(
         "teams": teams,
         "filters": filters,
         "k": k,
+        "include_context": include_context,
     }
+    _check_names(a)
     sql = _build_sql(a)
     params = _build_params(a)
-    rows = _execute(sql, params)
-    print(sql, rows, params)  # debug
-    return _to_markdown(rows)
+    log.debug("sql=%s params=%s", sql, params)
+    return query_markdown(sql, params)
+
+async def run_player_stats_op_async(**kwargs: Any) -> str:
+    # DuckDB is sync: run in a worker thread so several tool calls can be awaited together
+    return await asyncio.to_thread(run_player_stats_op, **kwargs)
 
 # --- Structured Tool ---
 player_stats_aggregate_tool = StructuredTool.from_function(
@@ -218,9 +231,10 @@ player_stats_aggregate_tool = StructuredTool.from_function(
     description=(
         "Aggregate player stats from parquet. "
         "Args: season, metric|metrics, agg(avg|sum|min|max|count|median|pNN), "
-        "group_by(none|player|team|position), players, teams, filters, k."
+        "group_by(none|player|team), players, teams, filters, k, include_context (games_played)."
     ),
     func=run_player_stats_op,
+    coroutine=run_player_stats_op_async,
     args_schema=PlayerStatsAggregateArgs,
 )
 
@@ -257,7 +271,7 @@ if __name__ == "__main__":
         # 4. Percentile example: p90 of assists per player (filter by games played >= 50)
         {"metric": "ast", "agg": "p90", "group_by": "none", "filters": {"g__gte": 50}},
 
-        # 5. Multiple metrics grouped by team (UNION form)
+        # 5. Multiple metrics grouped by team (one grouped scan, unpivoted to a row per metric)
         {"metrics": ["pts", "ast"], "agg": "avg", "group_by": "team", "k": 5},
 
         # 6. Single player focus (list of players)
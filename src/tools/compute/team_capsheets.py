@@ -1,37 +1,36 @@
 # tools/compute/team_capsheets.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-import duckdb
+import asyncio
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from pydantic import BaseModel, Field, field_validator
 from langchain.tools import StructuredTool
+from src.tools.base.warehouse import (
+    cached_tool_output, columns, filter_column, parse_filter_key, query_markdown, row_count,
+)
 
-PARQUET_PATH = "data/parquet/team_capsheets.parquet"
-
-# Single cached DuckDB connection
-_conn: duckdb.DuckDBPyConnection | None = None
-def _con() -> duckdb.DuckDBPyConnection:
-    global _conn
-    if _conn is None:
-        _conn = duckdb.connect(database=":memory:")
-    return _conn
+TABLE = "team_capsheets"  # warehouse table (see src/tools/base/warehouse.py)
 
-# Column cache
-_COLS: List[str] | None = None
-def _cols() -> List[str]:
-    global _COLS
+# Column cache, plus the cap_<YYYY_YY> lookups derived from it once
+_COLS: FrozenSet[str] | None = None
+_LATEST_CAP_COL: Optional[str] = None
+_CAP_COL_BY_SEASON: Dict[str, str] = {}           # '2026-27' -> cap_2026_27
+_CAP_COL_BY_YEAR: Tuple[Tuple[int, str], ...] = ()  # (start year, column), ascending
+def _cols() -> FrozenSet[str]:
+    global _COLS, _LATEST_CAP_COL, _CAP_COL_BY_SEASON, _CAP_COL_BY_YEAR
     if _COLS is None:
-        cur = _con().execute(f"SELECT * FROM read_parquet('{PARQUET_PATH}') LIMIT 1")
-        _COLS = [d[0] for d in cur.description]
+        cols = columns(TABLE)
+        cap_cols = sorted(c for c in cols if c.startswith("cap_"))
+        _LATEST_CAP_COL = cap_cols[-1] if cap_cols else None
+        _CAP_COL_BY_SEASON = {c[len("cap_"):].replace("_", "-"): c for c in cap_cols}
+        _CAP_COL_BY_YEAR = tuple(
+            (int(c.split("_")[1]), c) for c in cap_cols if c.split("_")[1].isdigit()
+        )
+        _COLS = frozenset(cols)
     return _COLS
 
 # Map any salary/cap-ish metric hint to base 'cap'
 _CAP_SYNONYMS = {"cap", "salary", "salary_cap", "cap_space", "total_salary"}
 
-def _season_to_col(season: Optional[str]) -> Optional[str]:
-    if not season:
-        return None
-    return f"cap_{season.replace('-', '_')}"
-
 def _pick_cap_column(season: Optional[str], metric: Optional[str]) -> str:
     cols = _cols()
     # Explicit existing column
@@ -41,44 +40,21 @@ def _pick_cap_column(season: Optional[str], metric: Optional[str]) -> str:
     base = (metric or "cap").lower()
     if base in _CAP_SYNONYMS:
         # Try season-specific
-        if season:
-            cand = _season_to_col(season)
-            if cand and cand in cols:
-                return cand
+        if season and season in _CAP_COL_BY_SEASON:
+            return _CAP_COL_BY_SEASON[season]
         # Fallback: latest (max) cap_YYYY_YY column
-        cap_cols = sorted([c for c in cols if c.startswith("cap_")])
-        if cap_cols:
+        if _LATEST_CAP_COL:
             # If season requested but not present, attempt nearest (by start year)
-            if season:
+            if season and _CAP_COL_BY_YEAR:
                 try:
                     target = int(season.split("-")[0])
-                    by_year = []
-                    for c in cap_cols:
-                        try:
-                            y = int(c.split("_")[1])
-                            by_year.append((abs(y - target), y, c))
-                        except:
-                            continue
-                    by_year.sort()
-                    return by_year[0][2]
-                except:
+                    return min(_CAP_COL_BY_YEAR, key=lambda yc: (abs(yc[0] - target), yc[0]))[1]
+                except ValueError:
                     pass
-            return cap_cols[-1]
+            return _LATEST_CAP_COL
     # As last resort, raise (will surface a clear error)
     raise ValueError(f"Could not resolve cap column for season='{season}' metric='{metric}'")
 
-def _markdown(rows: List[Dict[str, Any]]) -> str:
-    if not rows:
-        return "_No results._"
-    headers = list(rows[0].keys())
-    lines = [
-        "| " + " | ".join(headers) + " |",
-        "| " + " | ".join(["---"] * len(headers)) + " |",
-    ]
-    for r in rows:
-        lines.append("| " + " | ".join(str(r[h]) for h in headers) + " |")
-    return "\n".join(lines)
-
 class TeamCapsArgs(BaseModel):
     season: Optional[str] = Field(default=None, description="Season like 2026-27 (used to select cap_<YYYY_YY> column)")
     metric: Optional[str] = Field(default="cap", description="Metric hint or explicit column (cap_YYYY_YY). Hints: cap, salary, cap_space")
@@ -114,24 +90,20 @@ def _build_where(a: TeamCapsArgs) -> tuple[str, List[Any]]:
     clauses: List[str] = []
     params: List[Any] = []
     if a.teams:
-        placeholders = ",".join(["?"] * len(a.teams))
-        clauses.append(f"team IN ({placeholders})")
-        params.extend(a.teams)
+        clauses.append("list_contains(?, team)")  # whole list is one parameter
+        params.append(list(a.teams))
     if a.filters:
-        op_map = {"gte": ">=", "lte": "<=", "gt": ">", "lt": "<", "eq": "=", "ne": "!="}
+        cols = _cols()
         for key, val in a.filters.items():
-            if val is None:
+            parsed = parse_filter_key(key)
+            if val is None or parsed is None:
                 continue
-            if "__" in key:
-                col, suf = key.split("__", 1)
-                if suf in op_map:
-                    clauses.append(f"{col} {op_map[suf]} ?")
-                    params.append(val)
-            else:
-                clauses.append(f"{key} = ?")
-                params.append(val)
+            col, op = parsed
+            clauses.append(f"{filter_column(TABLE, col, cols)} {op} ?")
+            params.append(val)
     return (" AND ".join(clauses)) if clauses else "TRUE", params
 
+@cached_tool_output
 def run_team_capsheets(
     season: Optional[str] = None,
     metric: Optional[str] = "cap",
@@ -152,43 +124,49 @@ def run_team_capsheets(
     )
     cap_col = _pick_cap_column(args.season, args.metric)
     where_sql, params = _build_where(args)
-    con = _con()
 
     if args.group_by == "team":
         # Direct values per team (no aggregation over single value)
         sql = f"""
         SELECT team, {cap_col} AS value
-        FROM read_parquet('{PARQUET_PATH}')
+        FROM {TABLE}
         WHERE {where_sql}
         ORDER BY value DESC
         """
         if args.k:
-            sql += f" LIMIT {int(args.k)}"
+            sql += " LIMIT ?"  # bound, so the SQL text is the same for every k
+            params.append(int(args.k))
     else:
         # Aggregate across all teams
         if args.agg == "count":
             agg_expr = "COUNT(*)"
         else:
             agg_expr = f"{args.agg.upper()}({cap_col})"
-        # capture team with max when agg=max (optional)
+        # capture team with max when agg=max (optional); arg_max finds it in the same scan
         extra_cols = ""
         if args.agg == "max":
-            extra_cols = f", (SELECT team FROM read_parquet('{PARQUET_PATH}') ORDER BY {cap_col} DESC LIMIT 1) AS top_team"
+            extra_cols = f", arg_max(team, {cap_col}) AS top_team"
         sql = f"""
         SELECT {agg_expr} AS value, '{cap_col}' AS metric_col{extra_cols}
-        FROM read_parquet('{PARQUET_PATH}')
+        FROM {TABLE}
         WHERE {where_sql}
         """
+        if args.agg == "count" and where_sql == "TRUE":
+            # Unfiltered count: the cached table row count, no scan
+            sql = f"SELECT ? AS value, '{cap_col}' AS metric_col"
+            params = [row_count(TABLE)]
+
+    return query_markdown(sql, params)
 
-    cur = con.execute(sql, params)
-    cols = [d[0] for d in cur.description]
-    rows = [{cols[i]: row[i] for i in range(len(cols))} for row in cur.fetchall()]
-    return _markdown(rows)
+async def run_team_capsheets_async(**kwargs: Any) -> str:
+    # DuckDB is sync: run in a worker thread so several tool calls can be awaited together
+    return await asyncio.to_thread(run_team_capsheets, **kwargs)
 
 team_capsheets_aggregate_tool = StructuredTool.from_function(
     name="team_capsheets_aggregate",
     description="Team cap sheet aggregation. Args: season, metric (cap|salary|cap_space or cap_YYYY_YY), group_by(team|none), agg (for none), k, teams filter.",
     func=run_team_capsheets,
+    coroutine=run_team_capsheets_async,
     args_schema=TeamCapsArgs,
 )
 
@@ -1,20 +1,16 @@
 # tools/compute/sql/team_picks_tool.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-import duckdb
+import asyncio
+import logging
+from typing import Any, Dict, Iterator, List, Optional
 from pydantic import BaseModel, Field, field_validator
 from langchain.tools import StructuredTool
+from src.tools.base.warehouse import cached_tool_output, query_markdown, row_count
 
-# Parquet with columns: team, pick_year (int), pick_round ("First"/"Second"), details
-PARQUET_PATH = "data/parquet/team_picks.parquet"
+# Parquet with columns: team, team_short, pick_year (int), pick_round ("First"/"Second"), details
+TABLE = "team_picks"  # warehouse table (see src/tools/base/warehouse.py)
 
-# Cached DuckDB connection
-_CONN: duckdb.DuckDBPyConnection | None = None
-def _con() -> duckdb.DuckDBPyConnection:
-    global _CONN
-    if _CONN is None:
-        _CONN = duckdb.connect(database=":memory:")
-    return _CONN
+log = logging.getLogger(__name__)
 
 # ---------- Helpers ----------
 def _season_to_year(season: str) -> Optional[int]:
@@ -42,17 +38,12 @@ def _normalize_round(r: Optional[str]) -> Optional[str]:
         return "Second"
     return None  # ignore unknown
 
-def _markdown(rows: List[Dict[str, Any]]) -> str:
-    if not rows:
-        return "_No results._"
-    headers = list(rows[0].keys())
-    lines = [
-        "| " + " | ".join(headers) + " |",
-        "| " + " | ".join(["---"] * len(headers)) + " |",
-    ]
-    for r in rows:
-        lines.append("| " + " | ".join(str(r[h]) for h in headers) + " |")
-    return "\n".join(lines)
+_PICKS_SUFFIX = " future nba draft picks"
+
+def _short_team(t: str) -> str:
+    """'Oklahoma City Thunder Future NBA Draft Picks' -> 'Oklahoma City Thunder' (team_short form)."""
+    t = t.strip()
+    return t[:-len(_PICKS_SUFFIX)].rstrip() if t.lower().endswith(_PICKS_SUFFIX) else t
 
 # ---------- Args Schema ----------
 _ALLOWED_GROUP_BY = {"none", "team", "year", "round"}
@@ -72,6 +63,7 @@ class TeamPicksAggregateArgs(BaseModel):
     k: Optional[int] = Field(default=None, description="Top-k limit for grouped results")
     limit: Optional[int] = Field(default=None, description="Limit for raw listing (agg=none)")
     filters: Optional[Dict[str, Any]] = Field(default=None, description="Extra filters: details__like substring")
+    include_details: bool = Field(default=True, description="Raw listing (agg=none) also returns the details text column")
     
     @field_validator("group_by", mode="before")
     @classmethod
@@ -109,9 +101,8 @@ def _years_clause(a: TeamPicksAggregateArgs, params: List[Any]) -> str:
             a.year = yr
     
     if a.years:
-        placeholders = ",".join(["?"] * len(a.years))
-        year_filters.append(f"pick_year IN ({placeholders})")
-        params.extend(a.years)
+        year_filters.append("list_contains(?, pick_year)")  # whole list is one parameter
+        params.append(list(a.years))
     elif a.year is not None:
         year_filters.append("pick_year = ?")
         params.append(a.year)
@@ -133,15 +124,10 @@ def _where(a: TeamPicksAggregateArgs) -> (str, List[Any]):
         clauses.append(yc)
     
     if a.teams:
-        # Minimal adjustment: dataset stores rows as "<Team> Future NBA Draft Picks"
-        teams_full = [
-            t if t.lower().endswith("future nba draft picks")
-            else f"{t} Future NBA Draft Picks"
-            for t in a.teams
-        ]
-        placeholders = ",".join(["?"] * len(teams_full))
-        clauses.append(f"team IN ({placeholders})")
-        params.extend(teams_full)
+        # team_short is stored without the " Future NBA Draft Picks" suffix, so inputs are
+        # compared as given (either form) and the long team column is not read to filter
+        clauses.append("list_contains(?, team_short)")
+        params.append([_short_team(t) for t in a.teams])
     
     if a.pick_round:
         clauses.append("pick_round = ?")
@@ -162,7 +148,8 @@ def _build_sql(a: TeamPicksAggregateArgs) -> (str, List[Any]):
     
     # Raw listing
     if a.agg == "none":
-        select_cols = "team, pick_year, pick_round, details"
+        # details is the wide text column; only read it when the listing should show it
+        select_cols = "team, pick_year, pick_round, details" if a.include_details else "team, pick_year, pick_round"
         order = ""
         if a.group_by == "team":
             order = "ORDER BY team, pick_year, pick_round"
@@ -174,19 +161,20 @@ def _build_sql(a: TeamPicksAggregateArgs) -> (str, List[Any]):
             order = "ORDER BY pick_year, team, pick_round"
         sql = f"""
         SELECT {select_cols}
-        FROM read_parquet('{PARQUET_PATH}')
+        FROM {TABLE}
         WHERE {where_sql}
         {order}
         """
         if a.limit:
-            sql += f" LIMIT {int(a.limit)}"
+            sql += " LIMIT ?"  # bound, so the SQL text is the same for every limit/k
+            params.append(int(a.limit))
         return sql, params
     
     # agg == count
     if a.group_by == "team":
         sql = f"""
         SELECT team, COUNT(*) AS value
-        FROM read_parquet('{PARQUET_PATH}')
+        FROM {TABLE}
         WHERE {where_sql}
         GROUP BY team
         ORDER BY value DESC
@@ -194,7 +182,7 @@ def _build_sql(a: TeamPicksAggregateArgs) -> (str, List[Any]):
     elif a.group_by == "year":
         sql = f"""
         SELECT pick_year AS year, COUNT(*) AS value
-        FROM read_parquet('{PARQUET_PATH}')
+        FROM {TABLE}
         WHERE {where_sql}
         GROUP BY pick_year
         ORDER BY value DESC
@@ -202,21 +190,34 @@ def _build_sql(a: TeamPicksAggregateArgs) -> (str, List[Any]):
     elif a.group_by == "round":
         sql = f"""
         SELECT pick_round AS round, COUNT(*) AS value
-        FROM read_parquet('{PARQUET_PATH}')
+        FROM {TABLE}
         WHERE {where_sql}
         GROUP BY pick_round
         ORDER BY value DESC
         """
+    elif where_sql == "TRUE":  # none, unfiltered: the cached table row count
+        sql = "SELECT ? AS value"
+        params = [row_count(TABLE)]
     else:  # none
         sql = f"""
         SELECT COUNT(*) AS value
-        FROM read_parquet('{PARQUET_PATH}')
+        FROM {TABLE}
         WHERE {where_sql}
         """
     if a.k and a.group_by in {"team", "year", "round"}:
-        sql += f" LIMIT {int(a.k)}"
+        sql += " LIMIT ?"
+        params.append(int(a.k))
     return sql, params
 
+def statement_shapes() -> Iterator[str]:
+    """SQL of the common count shapes (grouping x year filter x round) for warehouse.prewarm()."""
+    for group_by in sorted(_ALLOWED_GROUP_BY):
+        for years in ({}, {"year": 2026}, {"start_year": 2026, "end_year": 2030}):
+            for pick_round in (None, "First"):
+                args = TeamPicksAggregateArgs(agg="count", group_by=group_by, pick_round=pick_round, **years)
+                yield _build_sql(args)[0]
+
+@cached_tool_output
 def run_team_picks_agg(
     season: Optional[str] = None,
     year: Optional[int] = None,
@@ -230,6 +231,7 @@ def run_team_picks_agg(
     k: Optional[int] = None,
     limit: Optional[int] = None,
     filters: Optional[Dict[str, Any]] = None,
+    include_details: bool = True,
 ) -> str:
     args = TeamPicksAggregateArgs(
         season=season,
@@ -244,23 +246,26 @@ def run_team_picks_agg(
         k=k,
         limit=limit,
         filters=filters,
+        include_details=include_details,
     )
     sql, params = _build_sql(args)
-    cur = _con().execute(sql, params)
-    cols = [d[0] for d in cur.description]
-    rows = [{cols[i]: row[i] for i in range(len(cols))} for row in cur.fetchall()]
+    log.debug("sql=%s params=%s", sql, params)
+    return query_markdown(sql, params)
 
-    print(sql, cols, rows)
-    return _markdown(rows)
+async def run_team_picks_agg_async(**kwargs: Any) -> str:
+    # DuckDB is sync: run in a worker thread so several tool calls can be awaited together
+    return await asyncio.to_thread(run_team_picks_agg, **kwargs)
 
 team_picks_aggregate_tool = StructuredTool.from_function(
     name="team_picks_aggregate_tool",
     description=(
         "Analyze future draft picks. Args: season ('2026-27'), year, start_year, end_year, years(list), "
         "teams(list), pick_round(First|Second|1|2), agg(count|none), group_by(team|year|round|none), "
-        "k (limit for grouped), limit (row cap for agg=none), filters (details__like substring)."
+        "k (limit for grouped), limit (row cap for agg=none), filters (details__like substring), "
+        "include_details (details column in agg=none listings)."
     ),
     func=run_team_picks_agg,
+    coroutine=run_team_picks_agg_async,
     args_schema=TeamPicksAggregateArgs,
 )
 
@@ -1,34 +1,28 @@
 # tools/compute/sql/team_stats_tool.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-import duckdb
+import asyncio
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional
 from pydantic import BaseModel, Field, field_validator
 from langchain.tools import StructuredTool
+from src.tools.base.warehouse import (
+    cached_tool_output, columns, filter_column, parse_filter_key, query_markdown,
+)
 
-PARQUET_PATH = "data/parquet/team_stats.parquet"
+TABLE = "team_stats"  # warehouse table (see src/tools/base/warehouse.py)
 DEFAULT_SEASON = "2024-25"
 
-# --- DuckDB connection cache ---
-_duck_con: duckdb.DuckDBPyConnection | None = None
-def _con() -> duckdb.DuckDBPyConnection:
-    global _duck_con
-    if _duck_con is None:
-        _duck_con = duckdb.connect(database=":memory:")
-    return _duck_con
-
 # --- Schema (lazy) ---
-_SCHEMA_COLS: List[str] | None = None
-_NUMERIC_COLS: List[str] | None = None
-def _schema_cols() -> List[str]:
+_SCHEMA_COLS: FrozenSet[str] | None = None
+_NUMERIC_COLS: FrozenSet[str] | None = None  # set: the validators only test membership
+def _schema_cols() -> FrozenSet[str]:
     global _SCHEMA_COLS, _NUMERIC_COLS
     if _SCHEMA_COLS is None:
-        cur = _con().execute(f"SELECT * FROM read_parquet('{PARQUET_PATH}') LIMIT 1")
-        _SCHEMA_COLS = [d[0] for d in cur.description]
+        _SCHEMA_COLS = frozenset(columns(TABLE))
         ignore = {"team", "season", "rk"}
-        _NUMERIC_COLS = [c for c in _SCHEMA_COLS if c not in ignore]
+        _NUMERIC_COLS = frozenset(c for c in _SCHEMA_COLS if c not in ignore)
     return _SCHEMA_COLS
 
-def _numeric_cols() -> List[str]:
+def _numeric_cols() -> FrozenSet[str]:
     if _NUMERIC_COLS is None:
         _schema_cols()
     return _NUMERIC_COLS  # type: ignore
@@ -68,7 +62,7 @@ class TeamStatsAggregateArgs(BaseModel):
     def _validate_metrics(cls, v, info):
         if not v:
             return v
-        allowed = set(_numeric_cols())
+        allowed = _numeric_cols()
         bad = [m for m in v if m not in allowed]
         if bad:
             raise ValueError(f"Unknown metrics {bad}. Allowed examples: {sorted(list(allowed))[:12]} ...")
@@ -113,24 +107,20 @@ def _build_where(a: Dict[str, Any]) -> str:
             expanded.append(t)
             if not t.endswith("*"):
                 expanded.append(t + "*")
-        placeholders = ",".join(["?"] * len(expanded))
-        clauses.append(f"team IN ({placeholders})")
+        clauses.append("list_contains(?, team)")  # whole list is one parameter
         a["_expanded_teams"] = expanded  # stash for params
     # exclude league average unless included
     if not a.get("include_league_average"):
         clauses.append("team <> 'League Average'")
     # generic filters col / col__op
     filt = a.get("filters") or {}
-    op_map = {"gte": ">=", "lte": "<=", "gt": ">", "lt": "<", "eq": "=", "ne": "!="}
+    cols = _schema_cols()
     for k, v in filt.items():
-        if v is None:
+        parsed = parse_filter_key(k)
+        if v is None or parsed is None:
             continue
-        if "__" in k:
-            col, suf = k.split("__", 1)
-            if suf in op_map:
-                clauses.append(f"{col} {op_map[suf]} ?")
-        else:
-            clauses.append(f"{k} = ?")
+        col, op = parsed
+        clauses.append(f"{filter_column(TABLE, col, cols)} {op} ?")
     return " AND ".join(clauses) if clauses else "TRUE"
 
 def _build_params(a: Dict[str, Any]) -> List[Any]:
@@ -138,12 +128,15 @@ def _build_params(a: Dict[str, Any]) -> List[Any]:
     if a.get("season"):
         params.append(a["season"])
     if a.get("teams"):
-        params.extend(a["_expanded_teams"])
+        params.append(a["_expanded_teams"])
     filt = a.get("filters") or {}
     for k, v in filt.items():
-        if v is None:
+        if v is None or parse_filter_key(k) is None:
             continue
         params.append(v)
+    # Top-k is a bound LIMIT ? (grouped queries only), so the SQL text is the same for every k
+    if a.get("k") and a["group_by"] != "none":
+        params.append(int(a["k"]))
     return params
 
 def _build_sql(a: Dict[str, Any]) -> str:
@@ -163,61 +156,56 @@ def _build_sql(a: Dict[str, Any]) -> str:
         metric = metrics[0]
         if metric == "row_count":
             if group_by == "none":
-                return f"SELECT COUNT(*) AS row_count FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql}"
+                return f"SELECT COUNT(*) AS row_count FROM {TABLE} WHERE {where_sql}"
             sql = (
                 f"SELECT team AS team, COUNT(*) AS value "
-                f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql} GROUP BY team"
+                f"FROM {TABLE} WHERE {where_sql} GROUP BY team"
             )
             if a.get("k"):
-                sql += f" ORDER BY value DESC LIMIT {int(a['k'])}"
+                sql += " ORDER BY value DESC LIMIT ?"
             return sql
         if group_by == "none":
             return (
                 f"SELECT {_agg_expr(metric, agg)} AS {metric} "
-                f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql}"
+                f"FROM {TABLE} WHERE {where_sql}"
             )
         sql = (
             f"SELECT team AS team, {_agg_expr(metric, agg)} AS value "
-            f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql} GROUP BY team"
+            f"FROM {TABLE} WHERE {where_sql} GROUP BY team"
         )
         if a.get("k"):
-            sql += f" ORDER BY value DESC LIMIT {int(a['k'])}"
+            sql += " ORDER BY value DESC LIMIT ?"
         return sql
 
     # Multi-metric
     if group_by == "none":
         selects = [f"{_agg_expr(m, agg)} AS {m}" for m in metrics]
-        return f"SELECT {', '.join(selects)} FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql}"
+        return f"SELECT {', '.join(selects)} FROM {TABLE} WHERE {where_sql}"
 
-    # Multi metrics + group_by team: UNION rows (team, value, metric)
-    subs = [
-        f"SELECT team AS team, {_agg_expr(m, agg)} AS value, '{m}' AS metric "
-        f"FROM read_parquet('{PARQUET_PATH}') WHERE {where_sql} GROUP BY team"
-        for m in metrics
-    ]
-    union_sql = " UNION ALL ".join(subs)
+    # Multi metrics + group_by team: one grouped scan computing every metric, unpivoted to
+    # one (team, value, metric) row per team and metric
+    aggs = ", ".join(f"{_agg_expr(m, agg)} AS {m}" for m in metrics)
+    sql = (
+        f"SELECT team, value, metric FROM ("
+        f"SELECT team, {aggs} FROM {TABLE} WHERE {where_sql} GROUP BY team"
+        f") UNPIVOT INCLUDE NULLS (value FOR metric IN ({', '.join(metrics)}))"
+    )
     if a.get("k"):
-        union_sql = f"SELECT * FROM ({union_sql}) ORDER BY value DESC LIMIT {int(a['k'])}"
-    return union_sql
+        sql = f"SELECT * FROM ({sql}) ORDER BY value DESC LIMIT ?"
+    return sql
 
-def _execute(sql: str, params: List[Any]) -> List[Dict[str, Any]]:
-    cur = _con().execute(sql, params)
-    cols = [d[0] for d in cur.description]
-    return [{cols[i]: row[i] for i in range(len(cols))} for row in cur.fetchall()]
-
-def _to_markdown(rows: List[Dict[str, Any]]) -> str:
-    if not rows:
-        return "_No team stat results._"
-    headers = list(rows[0].keys())
-    lines = [
-        "| " + " | ".join(headers) + " |",
-        "| " + " | ".join(["---"] * len(headers)) + " |",
-    ]
-    for r in rows:
-        lines.append("| " + " | ".join(str(r[h]) for h in headers) + " |")
-    return "\n".join(lines)
+def statement_shapes() -> Iterator[str]:
+    """SQL of the common call shapes (default season, no team/filter args) for warehouse.prewarm()."""
+    for metric in sorted(_numeric_cols()):
+        for agg in ("avg", "sum", "min", "max"):
+            for group_by, k in (("none", None), ("team", None), ("team", 5)):
+                yield _build_sql({
+                    "season": DEFAULT_SEASON, "metrics": [metric], "agg": agg, "group_by": group_by,
+                    "teams": None, "filters": None, "k": k, "include_league_average": False,
+                })
 
 # --- Core callable ---
+@cached_tool_output
 def run_team_stats_op(
     season: Optional[str] = DEFAULT_SEASON,
     metric: Optional[str] = None,
@@ -231,8 +219,7 @@ def run_team_stats_op(
 ) -> str:
     if isinstance(group_by, list):
         group_by = group_by[0] if group_by else "none"
-    # Ensure schema loaded (validations rely on it)
-    _schema_cols()
+    # The metric validators load the schema themselves on first use (_numeric_cols)
     args_obj = TeamStatsAggregateArgs(
         season=season,
         metric=metric,
@@ -257,8 +244,11 @@ def run_team_stats_op(
     }
     sql = _build_sql(a)
     params = _build_params(a)
-    rows = _execute(sql, params)
-    return _to_markdown(rows)
+    return query_markdown(sql, params, empty="_No team stat results._")
+
+async def run_team_stats_op_async(**kwargs: Any) -> str:
+    # DuckDB is sync: run in a worker thread so several tool calls can be awaited together
+    return await asyncio.to_thread(run_team_stats_op, **kwargs)
 
 # --- Structured Tool ---
 team_stats_aggregate_tool = StructuredTool.from_function(
@@ -269,6 +259,7 @@ team_stats_aggregate_tool = StructuredTool.from_function(
         "k(top-k), include_league_average(bool). If no metric(s) given returns row_count."
     ),
     func=run_team_stats_op,
+    coroutine=run_team_stats_op_async,
     args_schema=TeamStatsAggregateArgs,
 )
 
@@ -1,29 +1,27 @@
 # src/tools/tool_registry.py
-
-# Retriever tools (direct data lookups)
-from src.tools.retriever.player_contracts import player_contracts_tool
-from src.tools.retriever.player_stats import player_stats_tool
-from src.tools.retriever.team_capsheets import team_capsheets_tool
-from src.tools.retriever.team_picks import team_picks_tool
-from src.tools.retriever.team_stats import team_stats_tool
+from src.tools.base.base_retriever_tool import make_retriever_tool
+from src.tools.base.warehouse import prewarm_on_first_use
 
 # Compute / aggregation tools (factory-produced, already instantiated in their modules)
 from src.tools.compute.player_contracts import contracts_aggregate_tool
 from src.tools.compute.player_stats import player_stats_aggregate_tool
 from src.tools.compute.team_capsheets import team_capsheets_aggregate_tool
-from src.tools.compute.team_picks import team_picks_aggregate_tool
-from src.tools.compute.team_stats import team_stats_aggregate_tool
+from src.tools.compute.team_picks import team_picks_aggregate_tool, statement_shapes as team_picks_shapes
+from src.tools.compute.team_stats import team_stats_aggregate_tool, statement_shapes as team_stats_shapes
 
-# Master registry (order can matter if an agent picks first match)
-ALL_TOOLS = [
-    # Retriever
-    player_contracts_tool,
-    player_stats_tool,
-    team_capsheets_tool,
-    team_picks_tool,
-    team_stats_tool,
+# Retriever tools (direct data lookups): (dataset_key, description, num_results)
+RETRIEVER_SPECS = [
+    ("player_contracts", "Answers questions about NBA player contracts", 1),
+    ("player_stats", "Answers questions about NBA player stats", 1),
+    ("team_capsheets", "Answers questions about NBA team salary cap sheets", 1),
+    ("team_picks", "Answers questions about NBA team picks", 20),
+    ("team_stats", "Answers questions about NBA team stats", 1),
+]
 
-    # Aggregation / compute
+# One Tool per spec, named <dataset_key>_tool; each loads its index on first use
+RETRIEVER_TOOLS = [make_retriever_tool(*spec) for spec in RETRIEVER_SPECS]
+
+COMPUTE_TOOLS = [
     contracts_aggregate_tool,
     player_stats_aggregate_tool,
     team_capsheets_aggregate_tool,
@@ -31,10 +29,9 @@ ALL_TOOLS = [
     team_stats_aggregate_tool
 ]
 
-RETRIEVER_TOOLS = [
-    player_contracts_tool,
-    player_stats_tool,
-    team_capsheets_tool,
-    team_picks_tool,
-    team_stats_tool
-]
\ No newline at end of file
+# Master registry (order can matter if an agent picks first match)
+ALL_TOOLS = RETRIEVER_TOOLS + COMPUTE_TOOLS
+
+# Parse the common team_stats / team_picks SQL shapes in the background once the first tool
+# query opens the warehouse (importing the registry does not touch the file)
+prewarm_on_first_use(team_stats_shapes, team_picks_shapes)